@@ -17,7 +17,8 @@ from pydantic import BaseModel
 
 import memory_repo as memory
 
-load_dotenv()
+if not os.getenv("ANTHROPIC_API_KEY"):
+    load_dotenv()
 
 logger = logging.getLogger("curator")
 
@@ -31,7 +32,27 @@ except ImportError:
 # Same model the production answers use (llm_interface.AnthropicLLM) - curation
 # fires on every single exchange, so it should cost roughly what one answer costs,
 # not more.
-CURATOR_MODEL = "claude-sonnet-5"
+CURATOR_MODEL = os.getenv("ANTHROPIC_MODEL", "claude-sonnet-5")
+
+# One client for every curation pass (created lazily, closed on app shutdown), so
+# passes reuse pooled connections instead of opening a fresh one each time.
+_client: AsyncAnthropic | None = None
+
+
+def _get_client() -> AsyncAnthropic:
+    global _client
+    if _client is None:
+        _client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared Anthropic client, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
 
 # Serializes curator runs so an /ask curation and a /begin-new-topic curation
 # firing close together can't race on reading/writing the same docs.
@@ -154,8 +175,7 @@ async def _run_curator(transcript: str, mode_instruction: str) -> None:
                 mode_instruction=mode_instruction,
             )
 
-            client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-            result = await client.messages.parse(
+            result = await _get_client().messages.parse(
                 model=CURATOR_MODEL,
                 # 1500 -> 6000: about_diana_md can now return the full protected
                 # core (~3200 chars, incl. the mission statement, homework and
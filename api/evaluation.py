@@ -5,9 +5,61 @@ Measures readability, complexity, safety, and engagement.
 """
 
 import re
-import statistics
+from functools import lru_cache
 from typing import Dict, List, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+
+
+# Syllable heuristic, applied to whitespace-delimited words (same as str.split()):
+# one syllable per vowel group, minus a trailing silent 'e', floored at 1.
+# Vowel groups are counted without branching: the UTF-8 bytes are mapped to
+# b'1' (ASCII vowel) or b'0' (anything else, including multi-byte chars), and
+# every group then starts at exactly one b'01' edge.
+_VOWEL_MASK = bytes(0x31 if chr(b) in 'aeiou' else 0x30 for b in range(256))
+_SILENT_E_RE = re.compile(r'e(?!\S)')
+# Words the floor lifts back to one syllable: no vowel group at all ("rhythm",
+# "42"), or a single group cancelled out by the silent-e rule ("the", "tree").
+_FLOORED_WORD_RE = re.compile(r'(?<!\S)[^\saeiou]+(?!\S)|(?<!\S)[^\saeiou]*[aeiou]*e(?!\S)')
+
+_WORD_RE = re.compile(r'\b\w+\b')
+_CHEMICAL_FORMULA_RE = re.compile(r'\b[A-Z][a-z]?\d+\b|\bH2O\b|\bCO2\b|\bO2\b')
+_DEGREE_RE = re.compile(r'\d+\s*°|\d+\s+degrees?')
+# Both patterns above need a digit; most answers have none
+_DIGIT_RE = re.compile(r'\d')
+_SCARY_RE = re.compile(r'death|die|kill|hurt|scary|monster')
+
+
+def _count_vowel_groups(text: str) -> int:
+    """Count runs of lowercase ASCII vowels"""
+    return (b'0' + text.encode('utf-8', 'surrogatepass').translate(_VOWEL_MASK)).count(b'01')
+
+
+# Common words ("the", "water", ...) repeat across responses and batches
+@lru_cache(maxsize=8192)
+def _count_syllables(word: str) -> int:
+    """Simple syllable counter (expects a lowercase word)"""
+    syllable_count = _count_vowel_groups(word)
+    
+    # Adjust for silent e
+    if word.endswith('e'):
+        syllable_count -= 1
+    
+    # Ensure at least 1 syllable
+    return max(1, syllable_count)
+
+
+def _flesch_score(sentence_count: int, word_count: int, syllable_count: int) -> float:
+    """
+    Calculate Flesch Reading Ease score.
+    90-100: Very easy (5th grade)
+    80-90: Easy (6th grade) 
+    70-80: Fairly easy (7th grade)
+    """
+    # Flesch Reading Ease formula
+    if sentence_count > 0 and word_count > 0:
+        score = 206.835 - 1.015 * (word_count / sentence_count) - 84.6 * (syllable_count / word_count)
+        return max(0, min(100, score))
+    return 100.0
 
 
 @dataclass
@@ -28,53 +80,88 @@ class ResponseEvaluator:
     """Evaluates responses for kid-friendliness"""
     
     # Simple words a 7-year-old should know (sample list)
-    SIMPLE_WORDS = set([
+    SIMPLE_WORDS = frozenset({
         'cat', 'dog', 'water', 'rain', 'sun', 'moon', 'star', 'tree', 'flower',
         'happy', 'sad', 'big', 'small', 'hot', 'cold', 'fast', 'slow',
         'mom', 'dad', 'friend', 'play', 'run', 'jump', 'eat', 'sleep',
         'color', 'sound', 'light', 'dark', 'up', 'down', 'in', 'out'
-    ])
+    })
     
     # Technical terms that should not appear
-    TECHNICAL_TERMS = {
+    TECHNICAL_TERMS = frozenset({
         'molecule', 'atom', 'frequency', 'vibration', 'chemical', 'formula',
         'compound', 'element', 'particle', 'wavelength', 'spectrum',
         'atmospheric', 'electromagnetic', 'synthesis', 'quantum',
         'algorithm', 'coefficient', 'density', 'velocity', 'acceleration'
-    }
+    })
     
-    # Banned phrases
-    BANNED_PHRASES = [
+    # Banned phrases (a tuple, not a set: issues are reported in this order)
+    BANNED_PHRASES = (
         'let me explain', 'good thinking', 'actually', 'basically',
         'as an ai', 'i can provide', 'there are several types'
-    ]
+    )
+    
+    def __init__(self):
+        # The metrics depend only on the response text (and this evaluator's
+        # tables), so replays of the same answers (eval reruns, A/B comparisons)
+        # are served from a per-instance cache
+        self._evaluate_cached = lru_cache(maxsize=1024)(self._evaluate)
     
     def evaluate(self, response: str, question: str = "") -> EvaluationMetrics:
         """Evaluate a response for kid-friendliness"""
+        if len(response) < _CACHE_MAX_LEN:
+            metrics = self._evaluate_cached(response)
+            # Fresh lists, so callers can't alter the cached entry
+            return replace(
+                metrics,
+                technical_terms_found=list(metrics.technical_terms_found),
+                safety_issues=list(metrics.safety_issues)
+            )
+        return self._evaluate(response)
+    
+    def _evaluate(self, response: str) -> EvaluationMetrics:
+        """Compute the metrics for one response"""
         
         # Clean the response
         response = response.strip()
+        # Lowercased once here and shared by every helper below
+        response_lower = response.lower()
         
-        # Split into sentences
         sentences = self._split_sentences(response)
         sentence_count = len(sentences)
         
         # Calculate word metrics
         word_counts = [len(s.split()) for s in sentences]
-        avg_words = statistics.mean(word_counts) if word_counts else 0
+        avg_words = sum(word_counts) / len(word_counts) if word_counts else 0
         max_words = max(word_counts) if word_counts else 0
         
-        # Calculate readability (Flesch Reading Ease)
-        readability = self._calculate_flesch_score(response)
-        
-        # Count complex words
-        complex_count = self._count_complex_words(response)
-        
         # Find technical terms
-        technical_found = self._find_technical_terms(response)
+        technical_found = self._find_technical_terms(response, response_lower)
         
         # Check safety issues
-        safety_issues = self._check_safety(response)
+        safety_issues = self._check_safety(response_lower)
+        
+        # Way too long: the sentence penalty alone already floors the overall
+        # score at 0 and it can't pass, so skip the syllable/readability work.
+        # Readability and complex words are reported as 0 (not computed).
+        if sentence_count > _EARLY_REJECT_SENTENCES:
+            return EvaluationMetrics(
+                sentence_count=sentence_count,
+                avg_words_per_sentence=round(avg_words, 1),
+                max_words_in_sentence=max_words,
+                readability_score=0.0,
+                complex_word_count=0,
+                technical_terms_found=technical_found,
+                safety_issues=safety_issues,
+                overall_score=0.0,
+                passed=False
+            )
+        
+        # Tokenize once - readability is arithmetic on these
+        word_count, syllable_count, complex_count = self._tokenize(response, response_lower)
+        
+        # Calculate readability (Flesch Reading Ease)
+        readability = _flesch_score(sentence_count, word_count, syllable_count)
         
         # Calculate overall score (0-100)
         overall_score = self._calculate_overall_score(
@@ -105,93 +192,60 @@ class ResponseEvaluator:
     
     def _split_sentences(self, text: str) -> List[str]:
         """Split text into sentences"""
-        # Simple sentence splitting
-        sentences = re.split(r'[.!?]+', text)
-        return [s.strip() for s in sentences if s.strip()]
+        # Simple sentence splitting on runs of . ! ? - plain str methods, so no
+        # regex engine; runs of separators just leave empty parts to drop
+        parts = text.replace('!', '.').replace('?', '.').split('.')
+        return [s for s in (p.strip() for p in parts) if s]
     
-    def _calculate_flesch_score(self, text: str) -> float:
+    def _tokenize(self, text: str, text_lower: str) -> Tuple[int, int, int]:
         """
-        Calculate Flesch Reading Ease score.
-        90-100: Very easy (5th grade)
-        80-90: Easy (6th grade) 
-        70-80: Fairly easy (7th grade)
+        Tokenize a response once for the readability metrics.
+        Returns (word_count, syllable_count, complex_word_count).
         """
-        sentences = self._split_sentences(text)
-        if not sentences:
-            return 100.0
+        word_count = len(text.split())
         
-        words = text.split()
-        word_count = len(words)
-        sentence_count = len(sentences)
-        
-        if word_count == 0:
-            return 100.0
-        
-        # Count syllables (simplified)
-        syllable_count = sum(self._count_syllables(word) for word in words)
-        
-        # Flesch Reading Ease formula
-        if sentence_count > 0 and word_count > 0:
-            score = 206.835 - 1.015 * (word_count / sentence_count) - 84.6 * (syllable_count / word_count)
-            return max(0, min(100, score))
-        return 100.0
-    
-    def _count_syllables(self, word: str) -> int:
-        """Simple syllable counter"""
-        word = word.lower()
-        vowels = 'aeiou'
-        syllable_count = 0
-        previous_was_vowel = False
-        
-        for char in word:
-            is_vowel = char in vowels
-            if is_vowel and not previous_was_vowel:
-                syllable_count += 1
-            previous_was_vowel = is_vowel
+        # Count syllables (simplified) - whole-text scans instead of a per-word
+        # loop; Flesch only needs the total
+        syllable_count = (
+            _count_vowel_groups(text_lower)
+            - len(_SILENT_E_RE.findall(text_lower))
+            + len(_FLOORED_WORD_RE.findall(text_lower))
+        )
         
-        # Adjust for silent e
-        if word.endswith('e'):
-            syllable_count -= 1
+        complex_count = self._count_complex_words(text_lower)
         
-        # Ensure at least 1 syllable
-        return max(1, syllable_count)
+        return word_count, syllable_count, complex_count
     
-    def _count_complex_words(self, text: str) -> int:
+    def _count_complex_words(self, text_lower: str) -> int:
         """Count words with 3+ syllables"""
-        words = re.findall(r'\b\w+\b', text.lower())
-        return sum(1 for word in words if self._count_syllables(word) >= 3)
+        words = _WORD_RE.findall(text_lower)
+        return sum(1 for word in words if _count_syllables(word) >= 3)
     
-    def _find_technical_terms(self, text: str) -> List[str]:
+    def _find_technical_terms(self, text: str, text_lower: str) -> List[str]:
         """Find technical terms in the text"""
-        text_lower = text.lower()
-        found = []
-        
-        for term in self.TECHNICAL_TERMS:
-            if term in text_lower:
-                found.append(term)
-        
-        # Also check for chemical formulas
-        if re.search(r'\b[A-Z][a-z]?\d+\b|\bH2O\b|\bCO2\b|\bO2\b', text):
-            found.append("chemical_formula")
+        found = [term for term in self.TECHNICAL_TERMS if term in text_lower]
         
-        # Check for degree notation
-        if re.search(r'\d+\s*°|\d+\s+degrees?', text):
-            found.append("degree_notation")
+        if _DIGIT_RE.search(text):
+            # Also check for chemical formulas
+            if _CHEMICAL_FORMULA_RE.search(text):
+                found.append("chemical_formula")
+            
+            # Check for degree notation
+            if _DEGREE_RE.search(text):
+                found.append("degree_notation")
         
         return found
     
-    def _check_safety(self, text: str) -> List[str]:
+    def _check_safety(self, text_lower: str) -> List[str]:
         """Check for safety issues"""
-        issues = []
-        text_lower = text.lower()
-        
         # Check banned phrases
-        for phrase in self.BANNED_PHRASES:
-            if phrase in text_lower:
-                issues.append(f"banned_phrase: {phrase}")
+        issues = [
+            f"banned_phrase: {phrase}"
+            for phrase in self.BANNED_PHRASES if phrase in text_lower
+        ]
         
         # Check for inappropriate content patterns
-        if re.search(r'death|die|kill|hurt|scary|monster', text_lower):
+        if _SCARY_RE.search(text_lower):
             issues.append("potentially_scary_content")
         
         return issues
@@ -228,11 +282,23 @@ class ResponseEvaluator:
         return max(0, min(100, score))
 
 
+# Past this many sentences a response is rejected without scoring readability
+# (from 8 sentences on, the overall score is already 0 - see
+# _calculate_overall_score)
+_EARLY_REJECT_SENTENCES = 10
+
+# Only responses shorter than this are cached
+_CACHE_MAX_LEN = 4096
+
+
 def evaluate_batch(responses: List[Tuple[str, str]]) -> Dict:
     """Evaluate a batch of question-response pairs"""
     evaluator = ResponseEvaluator()
     results = []
+    passed_count = 0
+    score_total = 0.0
     
+    # Aggregate stats are accumulated in the same pass as the evaluation
     for question, response in responses:
         metrics = evaluator.evaluate(response, question)
         results.append({
@@ -240,18 +306,18 @@ def evaluate_batch(responses: List[Tuple[str, str]]) -> Dict:
             'response': response,
             'metrics': metrics
         })
+        passed_count += metrics.passed
+        score_total += metrics.overall_score
     
-    # Calculate aggregate stats
-    passed_count = sum(1 for r in results if r['metrics'].passed)
-    avg_score = statistics.mean(r['metrics'].overall_score for r in results)
+    total = len(results)
     
     return {
         'results': results,
         'summary': {
-            'total': len(results),
+            'total': total,
             'passed': passed_count,
-            'pass_rate': round(passed_count / len(results) * 100, 1),
-            'avg_score': round(avg_score, 1)
+            'pass_rate': round(passed_count / total * 100, 1) if total else 0.0,
+            'avg_score': round(score_total / total, 1) if total else 0.0
         }
     }
 
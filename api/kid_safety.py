@@ -1,18 +1,118 @@
 import re
+from functools import lru_cache
 from typing import Tuple, List
-from prompts import TECHNICAL_BANLIST, FILLER_PHRASES, SIMPLE_REPLACEMENTS, KID_REWRITE_PROMPT
+from prompts import TECHNICAL_BANLIST, FILLER_PHRASES, KID_REWRITE_PROMPT
 import langdetect
 
 
+_SENTENCE_SPLIT_KEEP_RE = re.compile(r'([.!?]+)')
+# Matches H2O, CH4, CO2, etc
+_CHEMICAL_FORMULA_RE = re.compile(r'\b[A-Z][a-z]?\d+\b|\b[A-Z]{2,}\d*\b')
+_DEGREE_RE = re.compile(r'\d+\s*°|degrees?', re.IGNORECASE)
+_SPACES_RE = re.compile(r'[ \t]+')
+_LEADING_PUNCT_RE = re.compile(r'^\s*[,.]\s*')
+
+# Only remove the most egregious filler phrases that never belong
+_EGREGIOUS_FILLERS = [
+    "good thinking",
+    "great question",
+    "boa pergunta",  # Portuguese
+    "as an ai",
+    "let me explain",
+    "actually,",
+    "basically,",
+    "there are three types",
+    "there are several types"
+]
+# One pass removes every filler (with its punctuation and following space) and
+# "Want more?" (the UI handles that). The leading lookahead on the possible first
+# letters lets the scan skip most positions without trying every alternative.
+_CLEANUP_RE = re.compile(
+    '(?=[' + ''.join(sorted({filler[0] for filler in _EGREGIOUS_FILLERS} | {'w'})) + '])(?:'
+    + '|'.join(re.escape(filler) + r'[.!?]?\s*' for filler in _EGREGIOUS_FILLERS)
+    + r'|Want\s+(?:to\s+know\s+)?more\??\.?)',
+    re.IGNORECASE
+)
+
+# Portuguese (Portugal) specific replacements
+_PT_PT_REPLACEMENTS = {
+    'você': 'tu',
+    'vocês': 'vocês',  # Keep vocês for plural
+    'banheiro': 'casa de banho',
+    'trem': 'comboio',
+    'ônibus': 'autocarro',
+    'sorvete': 'gelado',
+    'criança': 'miúdo',
+    'crianças': 'miúdos',
+}
+_PT_PT_REPLACEMENT_RES = [
+    (re.compile(r'\b' + br_word + r'\b', re.IGNORECASE), pt_word)
+    for br_word, pt_word in _PT_PT_REPLACEMENTS.items()
+]
+
+
+# Fast path for the en/pt decision: common function words, disjoint between
+# the two sets ('a' and 'do' are words in both languages, so neither has them)
+_WORD_TOKEN_RE = re.compile(r'\w+')
+_PT_WORD_MARKERS = frozenset({
+    'não', 'é', 'você', 'vocês', 'tu', 'está', 'estão', 'são', 'que', 'uma',
+    'um', 'para', 'porque', 'porquê', 'como', 'da', 'das', 'dos', 'ao', 'os',
+    'ou', 'isso', 'também', 'muito', 'onde', 'quando', 'quem', 'qual', 'há',
+})
+# ...of which these are Spanish words too: they count, but can't make the
+# call on their own
+_PT_ES_SHARED_WORDS = frozenset({
+    'tu', 'está', 'que', 'para', 'porque', 'como', 'da', 'das', 'dos', 'os',
+})
+_PT_CHAR_MARKERS = ('ã', 'õ', 'ç')
+_EN_WORD_MARKERS = frozenset({
+    'the', 'is', 'are', 'you', 'what', 'why', 'how', 'does', 'and', 'of', 'to',
+    'it', 'this', 'that', 'can', 'my', 'your', 'was', 'were', 'where', 'when',
+    'who', 'which',
+})
+# Spanish-only words and characters: any of them leaves the call to langdetect
+_ES_WORD_MARKERS = frozenset({
+    'el', 'los', 'las', 'es', 'una', 'del', 'y', 'qué', 'cómo', 'dónde',
+    'cuándo', 'muy', 'pero', 'hay', 'usted',
+})
+_ES_CHAR_MARKERS = ('ñ', '¿', '¡')
+_PT_PT_MARKERS = ('tu', 'torneira', 'autocarro', 'comboio', 'miúdo')
+
+# Make langdetect's fallback deterministic across calls
+langdetect.DetectorFactory.seed = 0
+
+
+def _guess_language(text_lower: str):
+    """Return 'pt' or 'en' when the text clearly is one of them, else None."""
+    words = _WORD_TOKEN_RE.findall(text_lower)
+    if (any(w in _ES_WORD_MARKERS for w in words)
+            or any(c in text_lower for c in _ES_CHAR_MARKERS)):
+        return None
+    pt_words = [w for w in words if w in _PT_WORD_MARKERS]
+    pt_hits = len(pt_words)
+    pt_only = any(w not in _PT_ES_SHARED_WORDS for w in pt_words)
+    if any(c in text_lower for c in _PT_CHAR_MARKERS):
+        pt_hits += 1
+        pt_only = True
+    en_hits = sum(1 for w in words if w in _EN_WORD_MARKERS)
+    if pt_hits >= 2 and pt_only and not en_hits:
+        return 'pt'
+    if en_hits >= 2 and not pt_hits:
+        return 'en'
+    return None
+
+
+@lru_cache(maxsize=4096)
 def detect_language(text: str) -> str:
-    """Detect the language of the text."""
+    """Detect the language of the text (cached: kids ask the same things a lot)."""
+    text_lower = text.lower()
     try:
-        lang = langdetect.detect(text)
+        # langdetect only for short or mixed text the marker words can't settle
+        lang = _guess_language(text_lower) or langdetect.detect(text)
         # Check for Portuguese variant
         if lang == 'pt':
             # Look for PT-PT specific words
-            pt_pt_markers = ['tu', 'torneira', 'autocarro', 'comboio', 'miúdo']
-            if any(marker in text.lower() for marker in pt_pt_markers):
+            if any(marker in text_lower for marker in _PT_PT_MARKERS):
                 return 'pt-PT'
             return 'pt'
         return lang
@@ -28,17 +128,17 @@ def needs_rewrite(text: str) -> Tuple[bool, List[str]]:
     issues = []
     
     # Check 1: Way too many sentences (only flag if excessive)
-    sentences = re.split(r'[.!?]+', text.strip())
-    sentences = [s.strip() for s in sentences if s.strip()]
+    parts = text.strip().replace('!', '.').replace('?', '.').split('.')
+    sentences = [s for s in (p.strip() for p in parts) if s]
     if len(sentences) > 8:  # Only flag if really long
         issues.append(f"Too many sentences: {len(sentences)} > 8")
     
     # Check 2: Chemical formulas or technical notation
     # More specific pattern for chemical formulas (H2O, CH4, CO2, etc)
-    if re.search(r'\b[A-Z][a-z]?\d+\b|\b[A-Z]{2,}\d*\b', text):  # Matches H2O, CH4, CO2, etc
+    if _CHEMICAL_FORMULA_RE.search(text):
         issues.append("Contains chemical formula")
     
-    if re.search(r'\d+\s*°|degrees?', text, re.IGNORECASE):
+    if _DEGREE_RE.search(text):
         issues.append("Contains degree notation")
     
     # Check 3: Technical banlist words
@@ -54,10 +154,9 @@ def needs_rewrite(text: str) -> Tuple[bool, List[str]]:
             issues.append(f"Sentences too long: avg {avg_words:.1f} words")
     
     # Check 5: Filler phrases
-    for filler in FILLER_PHRASES:
-        if filler in text_lower:
-            issues.append(f"Contains filler: '{filler}'")
-            break
+    filler = next((f for f in FILLER_PHRASES if f in text_lower), None)
+    if filler:
+        issues.append(f"Contains filler: '{filler}'")
     
     # Check 6: "Want more?" in text
     if "want more" in text_lower or "want to know more" in text_lower:
@@ -71,33 +170,13 @@ def clean_response(text: str) -> str:
     Minimal cleanup - only remove obvious filler phrases and "Want more?".
     Avoid deterministic word replacement that could break sentences.
     """
-    result = text
-    
-    # Only remove the most egregious filler phrases that never belong
-    egregious_fillers = [
-        "good thinking",
-        "great question",
-        "boa pergunta",  # Portuguese
-        "as an ai",
-        "let me explain",
-        "actually,",
-        "basically,",
-        "there are three types",
-        "there are several types"
-    ]
-    
-    for filler in egregious_fillers:
-        # Remove with punctuation and following space
-        pattern = re.escape(filler) + r'[.!?]?\s*'
-        result = re.sub(pattern, '', result, flags=re.IGNORECASE)
-    
-    # Remove "Want more?" since UI handles this
-    result = re.sub(r'Want\s+(to\s+know\s+)?more\??\.?', '', result, flags=re.IGNORECASE)
+    # Remove filler phrases and "Want more?" in a single scan
+    result = _CLEANUP_RE.sub('', text)
     
     # Clean up extra spaces BUT PRESERVE NEWLINES!
     # Only collapse multiple spaces (not newlines) into single space
-    result = re.sub(r'[ \t]+', ' ', result)  # Collapse multiple spaces/tabs
-    result = re.sub(r'^\s*[,.]\s*', '', result)  # Remove leading punctuation
+    result = _SPACES_RE.sub(' ', result)  # Collapse multiple spaces/tabs
+    result = _LEADING_PUNCT_RE.sub('', result)  # Remove leading punctuation
     
     return result.strip()
 
@@ -106,7 +185,7 @@ def truncate_to_two_sentences(text: str) -> str:
     """
     Hard truncate to first two sentences.
     """
-    sentences = re.split(r'([.!?]+)', text.strip())
+    sentences = _SENTENCE_SPLIT_KEEP_RE.split(text.strip())
     result = []
     sentence_count = 0
     
@@ -143,21 +222,9 @@ def format_for_language(text: str, language: str) -> str:
     Apply language-specific formatting.
     """
     if language == 'pt-PT':
-        # Portuguese (Portugal) specific replacements
-        pt_pt_replacements = {
-            'você': 'tu',
-            'vocês': 'vocês',  # Keep vocês for plural
-            'banheiro': 'casa de banho',
-            'trem': 'comboio',
-            'ônibus': 'autocarro',
-            'sorvete': 'gelado',
-            'criança': 'miúdo',
-            'crianças': 'miúdos',
-        }
-        
         result = text
-        for br_word, pt_word in pt_pt_replacements.items():
-            result = re.sub(r'\b' + br_word + r'\b', pt_word, result, flags=re.IGNORECASE)
+        for br_re, pt_word in _PT_PT_REPLACEMENT_RES:
+            result = br_re.sub(pt_word, result)
         
         return result
     
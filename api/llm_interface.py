@@ -1,11 +1,20 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Union
+import logging
 import os
 from anthropic import AsyncAnthropic
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables from .env - skipped when the environment already
+# carries them (docker-compose / systemd), so no file is parsed in production
+if not os.getenv("ANTHROPIC_API_KEY"):
+    load_dotenv()
+
+logger = logging.getLogger("llm")
+
+# Overridable with ANTHROPIC_MODEL (e.g. to try a new model without a deploy)
+DEFAULT_MODEL = "claude-sonnet-5"
 
 # Server-side web search tool (see the claude-api skill: web_search_20260209 is the
 # current variant with dynamic filtering, supported on Sonnet 5). Capped at 3 uses
@@ -18,11 +27,44 @@ WEB_SEARCH_TOOL = {
 }
 
 
+class FailedReply(str):
+    """A generate_stream chunk that marks the reply as failed: the fallback text
+    shown instead of an answer, or an empty marker when the stream broke off
+    after some text. Consumers treat it as ordinary text; callers that keep
+    replies (the response cache) check for it."""
+
+
+def _cached_system(system: Union[str, List[str]]) -> List[Dict[str, object]]:
+    """System prompt as text blocks, with a prompt-cache breakpoint on the first.
+
+    Anthropic caches the request prefix up to a breakpoint (tools, then the
+    system blocks), so the stable first block - the big invariant instructions -
+    is reused across requests. Later blocks (date, settings, memory) change
+    after nearly every exchange: a breakpoint there would pay the cache-write
+    price on most requests and almost never be read.
+    """
+    parts = [system] if isinstance(system, str) else system
+    blocks = [{"type": "text", "text": part} for part in parts if part]
+    if blocks:
+        blocks[0]["cache_control"] = {"type": "ephemeral"}
+    return blocks
+
+
 class LLMInterface(ABC):
     @abstractmethod
-    async def generate(self, system: str, user: str, history: list = None, max_tokens: int = 150, temperature: float = 0.7) -> Dict[str, object]:
+    async def generate(self, system: Union[str, List[str]], user: str, history: list = None, max_tokens: int = 150, temperature: float = 0.7) -> Dict[str, object]:
+        """Reply as {"text", "searched", "error"}; error is True when text is a
+        fallback message rather than an answer."""
         pass
 
+    async def generate_stream(self, system: Union[str, List[str]], user: str, history: list = None, max_tokens: int = 150, temperature: float = 0.7) -> AsyncIterator[str]:
+        """Yield the reply as it is written. Backends without streaming yield it whole."""
+        response = await self.generate(system, user, history, max_tokens, temperature)
+        yield FailedReply(response["text"]) if response["error"] else response["text"]
+
+    async def aclose(self) -> None:
+        """Release network resources (called on app shutdown)."""
+
 
 class AnthropicLLM(LLMInterface):
     def __init__(self):
@@ -31,21 +73,28 @@ class AnthropicLLM(LLMInterface):
             raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
 
         self.client = AsyncAnthropic(api_key=api_key)
-        self.model = "claude-sonnet-5"
+        self.model = os.getenv("ANTHROPIC_MODEL", DEFAULT_MODEL)
 
-    async def generate(self, system: str, user: str, history: list = None, max_tokens: int = 150, temperature: float = 0.7) -> Dict[str, object]:
-        messages = history if history else []
-        messages.append({"role": "user", "content": user})
+    async def aclose(self) -> None:
+        await self.client.close()
+
+    async def generate(self, system: Union[str, List[str]], user: str, history: list = None, max_tokens: int = 150, temperature: float = 0.7) -> Dict[str, object]:
+        # A new list: the caller's history (e.g. the session's, kept for the
+        # next turn) must not gain this user turn
+        messages = [*(history or ()), {"role": "user", "content": user}]
 
         try:
             response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=max_tokens,
-                system=system,
+                system=_cached_system(system),
                 messages=messages,
                 tools=[WEB_SEARCH_TOOL],
             )
 
+            # %r formatting is deferred, so nothing is built unless DEBUG is on
+            logger.debug("llm: stop_reason=%s content=%r", response.stop_reason, response.content)
+
             # Only "text" blocks ever reach the child - this naturally excludes
             # server_tool_use / web_search_tool_result blocks (and citations, which
             # are a separate structured field on the block, never inline markup).
@@ -63,18 +112,64 @@ class AnthropicLLM(LLMInterface):
             # Never hand the child an empty bubble (can happen if extended thinking
             # eats the whole token budget and no text block comes back).
             if not text.strip():
-                text = "Hmm, a Nuvem baralhou-se um bocadinho! 🌥️ Podes perguntar outra vez?"
+                return {
+                    "text": "Hmm, a Nuvem baralhou-se um bocadinho! 🌥️ Podes perguntar outra vez?",
+                    "searched": searched,
+                    "error": True,
+                }
 
-            return {"text": text, "searched": searched}
+            return {"text": text, "searched": searched, "error": False}
 
-        except Exception as e:
-            print(f"Anthropic API error: {e}")
+        except Exception:
+            logger.exception("llm: Anthropic API call failed")
             return {
                 "text": "I love answering questions! Can you try asking that in a different way?",
                 "searched": False,
+                "error": True,
             }
 
+    async def generate_stream(self, system: Union[str, List[str]], user: str, history: list = None, max_tokens: int = 150, temperature: float = 0.7) -> AsyncIterator[str]:
+        # A new list: the caller's history (e.g. the session's, kept for the
+        # next turn) must not gain this user turn
+        messages = [*(history or ()), {"role": "user", "content": user}]
 
+        got_text = False
+        try:
+            async with self.client.messages.stream(
+                model=self.model,
+                max_tokens=max_tokens,
+                system=_cached_system(system),
+                messages=messages,
+                tools=[WEB_SEARCH_TOOL],
+            ) as stream:
+                # text_stream only carries "text" block deltas, same as generate()
+                async for text in stream.text_stream:
+                    got_text = got_text or bool(text.strip())
+                    yield text
+
+        except Exception:
+            logger.exception("llm: Anthropic API call failed")
+            # After partial text, only mark the (cut-off) reply as failed
+            yield FailedReply("" if got_text else "I love answering questions! Can you try asking that in a different way?")
+            return
+
+        # Same empty-bubble guard as generate()
+        if not got_text:
+            yield FailedReply("Hmm, a Nuvem baralhou-se um bocadinho! 🌥️ Podes perguntar outra vez?")
+
+
+@lru_cache(maxsize=1)
 def get_llm_backend() -> LLMInterface:
-    """Get the LLM backend - now only Anthropic"""
+    """Get the LLM backend - now only Anthropic.
+
+    One shared instance per process, so every request reuses the same client and
+    its pooled keep-alive connections instead of paying a new TLS handshake.
+    """
     return AnthropicLLM()
+
+
+async def close_llm_backend() -> None:
+    """Close the shared backend, if one was created."""
+    if get_llm_backend.cache_info().currsize:
+        await get_llm_backend().aclose()
+        get_llm_backend.cache_clear()
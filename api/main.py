@@ -1,15 +1,23 @@
-from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
 from contextlib import asynccontextmanager
+import asyncio
+from collections import Counter, deque
+import hashlib
+import locale
 import os
-import json
-from datetime import datetime
-from typing import Dict, List
-import uuid
+import orjson
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, List, Set, Tuple
+import secrets
 import logging
 from pathlib import Path
 import glob
+import gzip
+import shutil
 
 from models import (
     AskRequest, AskResponse, Message,
@@ -18,7 +26,7 @@ from models import (
 )
 from pydantic import BaseModel, Field
 from typing import Optional
-from llm_interface import get_llm_backend
+from llm_interface import FailedReply, get_llm_backend, close_llm_backend
 from utils import (
     generate_context_id, chunk_text,
     is_safe_topic, count_tokens_approximate
@@ -28,6 +36,7 @@ from kid_safety import (
     detect_language, enforce_kid_safety, format_for_language
 )
 import curator
+from ttl_cache import TTLCache
 from memory_repo import ensure_memory_repo, read_memory_context
 
 # Best-effort mirror of live data to Supabase for the auditor dashboard. If it can't
@@ -39,9 +48,6 @@ except ImportError:
     telemetry_push = None
 
 
-# Context storage (in-memory for MVP)
-contexts: Dict[str, Dict] = {}
-
 # Settings model
 class UserSettings(BaseModel):
     name: Optional[str] = None
@@ -52,21 +58,42 @@ class UserSettings(BaseModel):
 BASE_DIR = Path(__file__).resolve().parent
 SETTINGS_FILE = Path(os.getenv("SETTINGS_FILE", str(BASE_DIR / "settings.json")))
 
+# (st_mtime_ns, settings) of the last read, so the file is only parsed again
+# after it changes
+_settings_cache: Optional[Tuple[int, UserSettings]] = None
+
 def load_settings() -> UserSettings:
-    """Load user settings from file."""
-    if SETTINGS_FILE.exists():
-        try:
-            with open(SETTINGS_FILE, "r") as f:
-                data = json.load(f)
-                return UserSettings(**data)
-        except:
-            pass
-    return UserSettings()
+    """Load user settings from file (cached until the file's mtime changes)."""
+    global _settings_cache
+    try:
+        mtime = SETTINGS_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return UserSettings()
+    if _settings_cache is not None and _settings_cache[0] == mtime:
+        return _settings_cache[1]
+    try:
+        data = orjson.loads(SETTINGS_FILE.read_bytes())
+        settings = UserSettings(**data)
+    except:
+        return UserSettings()
+    _settings_cache = (mtime, settings)
+    return settings
 
 def save_settings(settings: UserSettings):
     """Save user settings to file."""
-    with open(SETTINGS_FILE, "w") as f:
-        json.dump(settings.dict(), f, indent=2)
+    global _settings_cache
+    SETTINGS_FILE.write_bytes(orjson.dumps(settings.model_dump(), option=orjson.OPT_INDENT_2))
+    # Prime the cache so the next read doesn't parse what was just written
+    _settings_cache = (SETTINGS_FILE.stat().st_mtime_ns, settings)
+
+
+# Portuguese day/month names for the date in the system prompt. setlocale is
+# process-global (and not thread-safe), so it is set once at import rather than
+# on every request.
+try:
+    locale.setlocale(locale.LC_TIME, 'pt_PT.UTF-8')
+except:
+    pass  # Fallback to default locale
 
 
 def build_personalized_system_prompt() -> str:
@@ -75,55 +102,176 @@ def build_personalized_system_prompt() -> str:
     Extracted from /ask so other callers (e.g. the eval suite) reproduce the exact
     same prompt construction instead of forking this logic.
     """
-    import locale
-    try:
-        locale.setlocale(locale.LC_TIME, 'pt_PT.UTF-8')
-    except:
-        pass  # Fallback to default locale
+    return "".join(build_personalized_system_blocks())
 
-    now = datetime.now()
-    date_str = now.strftime("%A, %d de %B de %Y")
 
+def build_personalized_system_blocks() -> List[str]:
+    """The same prompt split as [SYSTEM_PROMPT, everything personal]. The first
+    block never changes, so the LLM backend can cache it as a prefix even when
+    the date, settings or memory in the second one do."""
+    return [SYSTEM_PROMPT, f"{_current_personalization()}{read_memory_context()}"]
+
+
+def _current_personalization() -> str:
     settings = load_settings()
+    return _personalization(settings.name, settings.gender, settings.date_of_birth, date.today())
+
+
+@lru_cache(maxsize=8)
+def _personalization(name: Optional[str], gender: Optional[str], date_of_birth: Optional[str],
+                     today: date) -> str:
+    """Settings + date part of the second block. Only rebuilt when the settings
+    or the day change."""
     personalization = ""
 
-    if settings.name:
-        personalization += f"\n\nA criança com quem estás a falar chama-se {settings.name}."
+    if name:
+        personalization += f"\n\nA criança com quem estás a falar chama-se {name}."
 
-    if settings.gender:
-        if settings.gender == "female":
+    if gender:
+        if gender == "female":
             personalization += " Ela é uma menina, usa sempre pronomes femininos."
-        elif settings.gender == "male":
+        elif gender == "male":
             personalization += " Ele é um menino, usa sempre pronomes masculinos."
 
-    if settings.date_of_birth:
+    if date_of_birth:
         try:
-            dob = datetime.fromisoformat(settings.date_of_birth)
-            age = (now - dob).days // 365
+            dob = datetime.fromisoformat(date_of_birth)
+            age = (datetime.combine(today, datetime.min.time()) - dob).days // 365
             personalization += f" Tem {age} anos."
         except:
             pass
 
-    return f"{SYSTEM_PROMPT}{personalization}\n\nHoje é {date_str}.{read_memory_context()}"
+    date_str = today.strftime("%A, %d de %B de %Y")
+    return f"{personalization}\n\nHoje é {date_str}."
 
 # Conversation logger
 class ConversationLogger:
+    # Most entries one background write may carry
+    WRITE_BATCH = 32
+    # Entries a /logs-stream client may fall behind by before it is dropped
+    SUBSCRIBER_BACKLOG = 100
+    
     def __init__(self):
         self.logs_dir = Path(os.getenv("LOGS_DIR", str(BASE_DIR / "logs")))
         self.logs_dir.mkdir(parents=True, exist_ok=True)
-        
-    def log_exchange(self, session_id: str, question: str, response: str, language: str):
-        """Log a Q&A exchange to a JSON file."""
+        # Parsed entries per log file, and how many bytes of each were consumed,
+        # so /logs-data only parses what was appended since the last poll
+        self._entries: Dict[Path, List[Dict]] = {}
+        self._offsets: Dict[Path, int] = {}
+        # Running totals per log file, updated as lines are parsed (see _summary())
+        self._file_stats: Dict[Path, Dict] = {}
+        # Each file's entries already serialized for /logs-data, as
+        # (entries covered, comma-joined JSON); extended as entries arrive
+        self._file_json: Dict[Path, Tuple[int, bytes]] = {}
+        self._read_lock = asyncio.Lock()
+        # The log file list only changes when the directory does (new day,
+        # deleted file), so it is re-globbed only when the dir mtime moves
+        self._dir_mtime = None
+        self._log_files: List[Path] = []
+        # Writes go through a queue drained by one task (see start()), which
+        # keeps today's file open and appends whatever has queued up in one go
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._handle = None
+        self._handle_path: Optional[Path] = None
+        # Current day's file name and weekday (see log_exchange)
+        self._log_day: Optional[date] = None
+        self._log_file: Optional[Path] = None
+        self._day_of_week = ""
+        # One queue per open /logs-stream connection; new entries go to each
+        self._subscribers: Set[asyncio.Queue] = set()
+    
+    async def start(self):
+        """Start the background writer (called from the app lifespan)."""
+        self._queue = asyncio.Queue(maxsize=1000)
+        self._writer = asyncio.create_task(self._drain())
+        # Days that ended while the app was down are still plain .jsonl
+        await asyncio.to_thread(self._compress_finished_logs)
+    
+    async def aclose(self):
+        """Flush everything queued, stop the writer and close the file."""
+        if self._writer:
+            await self._queue.put(None)
+            await self._writer
+            self._writer = self._queue = None
+        if self._handle:
+            self._handle.close()
+            self._handle = self._handle_path = None
+        for queue in list(self._subscribers):
+            self._end_stream(queue)
+    
+    def subscribe(self) -> asyncio.Queue:
+        """Queue that receives each new entry as a JSON line, until it gets None."""
+        queue = asyncio.Queue(maxsize=self.SUBSCRIBER_BACKLOG)
+        self._subscribers.add(queue)
+        return queue
+    
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+    
+    def _end_stream(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(None)
+    
+    def _publish(self, line: bytes):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(line)
+            except asyncio.QueueFull:
+                # A viewer that stopped reading: end its stream rather than
+                # buffer without bound (the browser reconnects and reloads)
+                self._end_stream(queue)
+    
+    async def _drain(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.WRITE_BATCH and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            stop = None in batch
+            batch = [item for item in batch if item is not None]
+            if batch:
+                try:
+                    await asyncio.to_thread(self._write_batch, batch)
+                except Exception:
+                    logging.exception("conversation log: failed to write %d entries", len(batch))
+            if stop:
+                return
+    
+    def _write_batch(self, batch: List[Tuple[Path, bytes]]):
+        for log_file, line in batch:
+            if log_file != self._handle_path:
+                # New day (or first write): rotate to that day's file
+                finished = self._handle_path
+                if self._handle:
+                    self._handle.close()
+                self._handle = open(log_file, "ab")
+                self._handle_path = log_file
+                if finished:
+                    self._compress(finished)
+            self._handle.write(line)
+        self._handle.flush()
+    
+    async def log_exchange(self, session_id: str, question: str, response: str, language: str):
+        """Log a Q&A exchange to a JSON file. The write happens off the event
+        loop, so a slow disk (SD card on the Pi) never stalls a request."""
         timestamp = datetime.now()
+        iso_timestamp = timestamp.isoformat()
         
-        # Create daily log file
-        log_file = self.logs_dir / f"conversations_{timestamp.strftime('%Y%m%d')}.jsonl"
+        # Daily log file - the name (and weekday) only change at midnight
+        day = timestamp.date()
+        if day != self._log_day:
+            self._log_day = day
+            self._log_file = self.logs_dir / f"conversations_{day:%Y%m%d}.jsonl"
+            self._day_of_week = day.strftime("%A")
+        log_file = self._log_file
         
         log_entry = {
             "session_id": session_id,
-            "timestamp": timestamp.isoformat(),
-            "day_of_week": timestamp.strftime("%A"),
-            "time_of_day": timestamp.strftime("%H:%M:%S"),
+            "timestamp": iso_timestamp,
+            "day_of_week": self._day_of_week,
+            "time_of_day": iso_timestamp[11:19],  # HH:MM:SS
             "language": language,
             "question": question,
             "response": response,
@@ -131,13 +279,172 @@ class ConversationLogger:
             "question_length": len(question)
         }
         
-        # Append to JSONL file (one JSON object per line)
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
+        # Append to JSONL file (one JSON object per line; orjson writes UTF-8
+        # unescaped, like ensure_ascii=False)
+        line = orjson.dumps(log_entry) + b"\n"
+        self._publish(line[:-1])
+        if self._queue is not None:
+            await self._queue.put((log_file, line))
+        else:
+            # No writer running (used outside the app): write it directly
+            await asyncio.to_thread(self._append, log_file, line)
+    
+    @staticmethod
+    def _append(log_file: Path, line: bytes):
+        with open(log_file, "ab") as f:
+            f.write(line)
+    
+    def _compress_finished_logs(self):
+        today = self.logs_dir / f"conversations_{datetime.now():%Y%m%d}.jsonl"
+        for log_file in self.logs_dir.glob("conversations_*.jsonl"):
+            if log_file != today:
+                self._compress(log_file)
+    
+    @staticmethod
+    def _compress(log_file: Path):
+        """Replace a finished day's log with conversations_YYYYMMDD.jsonl.gz."""
+        gz_file = log_file.with_name(log_file.name + ".gz")
+        tmp_file = log_file.with_name(log_file.name + ".gz.tmp")
+        try:
+            with open(log_file, "rb") as src, gzip.open(tmp_file, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            # Publish the .gz before removing the original, so a crash in between
+            # leaves a duplicate (skipped by the reader) rather than a lost day
+            tmp_file.replace(gz_file)
+            log_file.unlink()
+        except OSError:
+            logging.exception("conversation log: failed to compress %s", log_file)
+    
+    async def read_logs(self) -> Tuple[List[List[Dict]], Dict]:
+        """All logged exchanges, one list per log file, oldest file first, and
+        the totals over them."""
+        async with self._read_lock:
+            await asyncio.to_thread(self._read_new_entries)
+            # Copies, so a later read can't grow a list while it is being sent
+            return [self._entries[log_file][:] for log_file in sorted(self._entries)], self._summary()
+    
+    async def read_logs_json(self) -> Tuple[List[bytes], Dict]:
+        """Like read_logs, but each file's entries come as one comma-separated
+        run of JSON objects, ready to be put inside a JSON array."""
+        async with self._read_lock:
+            fragments = await asyncio.to_thread(self._read_json_fragments)
+            return fragments, self._summary()
+    
+    def _read_json_fragments(self) -> List[bytes]:
+        self._read_new_entries()
+        fragments = []
+        for log_file in sorted(self._entries):
+            entries = self._entries[log_file]
+            done, json_bytes = self._file_json.get(log_file, (0, b""))
+            if done < len(entries):
+                new = b",".join(map(orjson.dumps, entries[done:]))
+                json_bytes = json_bytes + b"," + new if json_bytes else new
+                self._file_json[log_file] = (len(entries), json_bytes)
+            if json_bytes:
+                fragments.append(json_bytes)
+        return fragments
+    
+    def _summary(self) -> Dict:
+        """Totals for the log viewer, from the per-file running stats."""
+        today = date.today().isoformat()
+        total = sum(stats["count"] for stats in self._file_stats.values())
+        response_chars = sum(stats["response_chars"] for stats in self._file_stats.values())
+        return {
+            "total": total,
+            "today": sum(stats["days"][today] for stats in self._file_stats.values()),
+            "unique_sessions": len(set().union(*(stats["sessions"] for stats in self._file_stats.values()))),
+            "avg_response_length": int(response_chars / total + 0.5) if total else 0,
+        }
+    
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {"count": 0, "response_chars": 0, "sessions": set(), "days": Counter()}
+    
+    def _read_new_entries(self):
+        """Parse the bytes appended to each log file since the last call."""
+        dir_mtime = self.logs_dir.stat().st_mtime_ns
+        if dir_mtime != self._dir_mtime:
+            log_files = set(self.logs_dir.glob("conversations_*.jsonl"))
+            gz_files = set(self.logs_dir.glob("conversations_*.jsonl.gz"))
+            # A plain file whose .gz already exists is mid-compression
+            log_files -= {gz_file.with_suffix("") for gz_file in gz_files}
+            self._log_files = list(log_files | gz_files)
+            self._dir_mtime = dir_mtime
+            for gone in (self._entries.keys() | self._offsets.keys()) - set(self._log_files):
+                self._entries.pop(gone, None)
+                self._offsets.pop(gone, None)
+                self._file_stats.pop(gone, None)
+                self._file_json.pop(gone, None)
+        
+        for log_file in self._log_files:
+            offset = self._offsets.get(log_file, 0)
+            try:
+                size = log_file.stat().st_size
+            except FileNotFoundError:
+                # Deleted (or compressed) since the glob: re-glob next time,
+                # which drops it
+                self._dir_mtime = None
+                continue
+            if size < offset:
+                # Truncated or replaced - start this file over
+                offset = 0
+                self._entries[log_file] = []
+                self._file_stats[log_file] = self._empty_stats()
+                self._file_json.pop(log_file, None)
+            elif size == offset:
+                continue
+            
+            if log_file.suffix == ".gz":
+                # Compressed days are never appended to: parse them once, whole
+                try:
+                    with gzip.open(log_file, "rb") as f:
+                        lines = f.read().splitlines()
+                except (OSError, EOFError):
+                    logging.exception("conversation log: unreadable %s", log_file)
+                    continue
+                self._entries[log_file] = []
+                self._file_stats[log_file] = self._empty_stats()
+                self._file_json.pop(log_file, None)
+                consumed = size
+            else:
+                try:
+                    with open(log_file, "rb") as f:
+                        f.seek(offset)
+                        data = f.read()
+                except FileNotFoundError:
+                    # Compressed at day rollover between the stat and the open
+                    self._dir_mtime = None
+                    continue
+                except OSError:
+                    logging.exception("conversation log: unreadable %s", log_file)
+                    continue
+                # Only consume complete lines; a write may be in progress
+                end = data.rfind(b"\n") + 1
+                lines = data[:end].splitlines()
+                consumed = offset + end
+            entries = self._entries.setdefault(log_file, [])
+            stats = self._file_stats.setdefault(log_file, self._empty_stats())
+            for line in lines:
+                # Blank or corrupt lines are rare; orjson rejects them, no need
+                # to pre-check every line
+                try:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+                if not isinstance(entry, dict):
+                    continue
+                entries.append(entry)
+                stats["count"] += 1
+                stats["response_chars"] += entry.get("response_length", 0)
+                stats["sessions"].add(entry.get("session_id"))
+                stats["days"][entry.get("timestamp", "")[:10]] += 1
+            self._offsets[log_file] = consumed
     
     def start_session(self):
         """Generate a new session ID for tracking conversations."""
-        return str(uuid.uuid4())[:8]
+        # 8 hex chars, same shape as the old uuid4()[:8] ids, without building
+        # (and stringifying) a whole UUID
+        return secrets.token_hex(4)
 
 conversation_logger = ConversationLogger()
 
@@ -148,144 +455,263 @@ async def lifespan(app: FastAPI):
     print("Starting Soft Terminal API...")
     memory_dir = ensure_memory_repo()
     print(f"Diana's memory repo ready at {memory_dir}")
+    await conversation_logger.start()
+    # Generation settings are read from the environment once, not per request
+    app.state.gen_params = {
+        "max_tokens": int(os.getenv("MAX_TOKENS", 800)),  # Increased to prevent truncation
+        "temperature": float(os.getenv("TEMPERATURE", 0.7)),  # Slightly higher for fun
+    }
+    # Resolve the LLM backend once; requests use app.state.llm directly. Without
+    # an API key it stays None and /ask reports the error per request, as before.
+    try:
+        app.state.llm = get_llm_backend()
+    except ValueError as e:
+        print(f"LLM backend unavailable: {e}")
+        app.state.llm = None
     yield
     # Shutdown
-    if os.getenv("SAVE_TRANSCRIPTS") == "true":
-        # Save transcripts to file
-        os.makedirs("transcripts", exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        with open(f"transcripts/session_{timestamp}.json", "w") as f:
-            json.dump(contexts, f, indent=2)
+    await conversation_logger.aclose()
+    await close_llm_backend()
+    await curator.close_client()
 
 
 app = FastAPI(
     title="Soft Terminal LLM API",
     version="1.0.0",
     docs_url="/docs",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson renders the JSON bodies (response models are still validated)
+    default_response_class=ORJSONResponse
 )
 
 # CORS configuration
+# Any origin (the UI is served from another port on the Pi), but no credentials:
+# nothing uses cookies, and without them Starlette answers with a fixed
+# "Access-Control-Allow-Origin: *" instead of echoing each request's origin
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # In production, specify actual origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
 )
 
+# Compress JSON/HTML bodies (the log viewer and /logs-data are the big ones).
+# Level 5 gets nearly all of level 9's ratio on JSON for a fraction of the
+# Pi's CPU time.
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
+
 
 # Use the new Kid Tutor v2 prompt
 SYSTEM_PROMPT = SYSTEM_PROMPT_V2
 
 
+# The routes below that return a Response themselves keep response_model for the
+# OpenAPI docs only - FastAPI skips validating/re-serializing a returned Response
 @app.get("/health", response_model=HealthResponse)
 async def health():
-    return HealthResponse(status="ok")
+    return ORJSONResponse({"status": "ok"})
 
 
 @app.get("/version", response_model=VersionResponse)
 async def version():
-    return VersionResponse(ui="1.0.0", api="1.0.0")
+    return ORJSONResponse({"ui": "1.0.0", "api": "1.0.0"})
 
 
 @app.post("/new-session")
 async def new_session():
     """Start a new conversation session."""
     session_id = conversation_logger.start_session()
+    session_histories.set(session_id, deque(maxlen=SESSION_HISTORY_LEN))
     return {"session_id": session_id}
 
 
+# Conversation history kept server-side per session, so the prompt prefix stays
+# byte-identical turn to turn. The history the UI sends is only used when the
+# server has none for the session (unknown id, expired, or the API restarted),
+# except that an empty one always wins: the UI cleared the conversation.
+SESSION_HISTORY_LEN = 30  # generous window: kids take many tiny turns, so a shallow one drops the topic mid-conversation
+session_histories = TTLCache(maxsize=256, ttl=3600, name="session history")
+
+
+def _llm_request(request: AskRequest) -> Dict:
+    """Arguments for llm.generate / llm.generate_stream, shared by /ask and /ask-stream."""
+    # Build conversation history for the LLM
+    history = session_histories.get(request.session_id) if request.session_id else None
+    if history is not None and request.history == []:
+        history.clear()
+    if history is not None:
+        messages = list(history)
+    else:
+        messages = [
+            {"role": msg.role, "content": msg.content}
+            for msg in (request.history or ())[-SESSION_HISTORY_LEN:]
+        ]
+    
+    return dict(
+        # Personalized system prompt (date + child's settings) - shared with the eval suite
+        system=build_personalized_system_blocks(),
+        user=request.question,
+        history=messages,  # Pass conversation history
+        **app.state.gen_params
+    )
+
+
+# Exact-match answer cache: kids ask the same questions again and again, and a
+# hit skips the model call entirely. Only first-turn questions are cached (see
+# _response_cache_key), so an answer never depends on a conversation.
+response_cache = TTLCache(maxsize=2048, ttl=float(os.getenv("RESPONSE_CACHE_TTL", 24 * 3600)),
+                          name="response cache")
+
+
+def _response_cache_key(llm_request: Dict) -> Optional[bytes]:
+    """Key for a question asked without history, None for a follow-up (its
+    answer depends on the conversation, so it is never cached).
+
+    Same invariant prompt + same settings and date + same question (ignoring
+    case and surrounding whitespace) -> same key. Diana's memory is left out:
+    the curator rewrites it after nearly every exchange, so a key over it
+    would almost never be hit again."""
+    if llm_request["history"]:
+        return None
+    return hashlib.sha1(orjson.dumps([
+        SYSTEM_PROMPT, _current_personalization(), llm_request["user"].strip().lower()
+    ])).digest()
+
+
+def _remember_exchange(session_id: Optional[str], llm_request: Dict, full_text: str):
+    """Append the finished turn to the session's server-side history."""
+    if not session_id:
+        return
+    history = session_histories.get(session_id)
+    if history is None:
+        history = deque(llm_request["history"], maxlen=SESSION_HISTORY_LEN)
+    history.append({"role": "user", "content": llm_request["user"]})
+    history.append({"role": "assistant", "content": full_text})
+    # Re-set so an active session keeps sliding its expiry forward
+    session_histories.set(session_id, history)
+
+
+async def _record_exchange(background_tasks: BackgroundTasks, session_id: str,
+                           question: str, full_text: str, language: str):
+    """Log a finished exchange and queue its curation/telemetry."""
+    # Log the conversation exchange
+    await conversation_logger.log_exchange(
+        session_id=session_id,
+        question=question,
+        response=full_text,
+        language=language
+    )
+
+    # Curate this exchange into Diana's memory repo AFTER responding - she
+    # never waits on it. curate_exchange never raises (see curator.py).
+    background_tasks.add_task(curator.curate_exchange, question, full_text)
+
+    # Mirror the exchange into Supabase for the auditor dashboard. Same
+    # fire-and-forget shape as curation above; push_conversation never
+    # raises (see telemetry/push.py).
+    if telemetry_push:
+        background_tasks.add_task(
+            telemetry_push.push_conversation,
+            session_id,
+            datetime.now(),
+            question,
+            full_text,
+            language,
+            os.getenv("TELEMETRY_SOURCE", "local"),
+        )
+
+
 @app.post("/ask", response_model=AskResponse)
 async def ask(request: AskRequest, background_tasks: BackgroundTasks):
     # Check topic safety
     is_safe, safety_message = is_safe_topic(request.question)
     if not is_safe:
-        return AskResponse(
-            response=safety_message,
-            formatted_response=f"<p>{safety_message}</p>"
-        )
+        return ORJSONResponse({"response": safety_message})
     
     try:
-        # Detect language from the question
-        language = detect_language(request.question)
-        
-        # Get LLM response with conversation history
-        llm = get_llm_backend()
-        
-        # Build conversation history for the LLM
-        messages = []
-        for msg in request.history[-30:]:  # generous window: kids take many tiny turns, so a shallow one drops the topic mid-conversation
-            messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-        
-        # Personalized system prompt (date + child's settings) - shared with the eval suite
-        system_with_date = build_personalized_system_prompt()
-        
-        response = await llm.generate(
-            system=system_with_date,
-            user=request.question,
-            history=messages,  # Pass conversation history
-            max_tokens=int(os.getenv("MAX_TOKENS", 800)),  # Increased to prevent truncation
-            temperature=float(os.getenv("TEMPERATURE", 0.7))  # Slightly higher for fun
-        )
-        
-        full_text = response['text'].strip()
-        
-        # DEBUG: Log raw response from Claude
-        newline_count = full_text.count('\n')
-        print(f"\n=== DEBUG: Raw Claude Response ===")
-        print(f"Question: {request.question[:100]}...")
-        print(f"Raw response:\n{full_text}")
-        print(f"Response has {newline_count} newlines")
-        print(f"=================================\n")
+        # Detect language from the question (langdetect is CPU-bound, keep it off the event loop)
+        language = await asyncio.to_thread(detect_language, request.question)
+        
+        llm_request = _llm_request(request)
+        cache_key = _response_cache_key(llm_request)
+        full_text = response_cache.get(cache_key) if cache_key else None
+        if full_text is None:
+            # Get LLM response with conversation history
+            llm = app.state.llm or get_llm_backend()
+            
+            response = await llm.generate(**llm_request)
+            
+            full_text = response['text'].strip()
+            # Only real answers: a fallback cached here would stick for the TTL
+            if cache_key and full_text and not response['error']:
+                response_cache.set(cache_key, full_text)
+            
+            # Raw response from Claude, only formatted when debug logging is on
+            logging.debug("ask: raw response to %r:\n%s", request.question[:100], full_text)
         
         # JUST PASS IT THROUGH - NO PROCESSING!
-        # Detect language just for logging
-        language = detect_language(request.question)
-        
-        # Log the conversation exchange
+        _remember_exchange(request.session_id, llm_request, full_text)
         session_id = request.session_id or conversation_logger.start_session()
-        conversation_logger.log_exchange(
-            session_id=session_id,
-            question=request.question,
-            response=full_text,
-            language=language
-        )
-
-        # Curate this exchange into Diana's memory repo AFTER responding - she
-        # never waits on it. curate_exchange never raises (see curator.py).
-        background_tasks.add_task(curator.curate_exchange, request.question, full_text)
-
-        # Mirror the exchange into Supabase for the auditor dashboard. Same
-        # fire-and-forget shape as curation above; push_conversation never
-        # raises (see telemetry/push.py).
-        if telemetry_push:
-            background_tasks.add_task(
-                telemetry_push.push_conversation,
-                session_id,
-                datetime.now(),
-                request.question,
-                full_text,
-                language,
-                os.getenv("TELEMETRY_SOURCE", "local"),
-            )
+        await _record_exchange(background_tasks, session_id, request.question, full_text, language)
 
         # Return EXACTLY what Claude sent - NO MODIFICATIONS
-        return AskResponse(
-            response=full_text
-        )
+        return ORJSONResponse({"response": full_text})
         
-    except Exception as e:
-        print(f"Error in /ask: {e}")
+    except Exception:
+        logging.exception("ask: failed")
         raise HTTPException(status_code=500, detail="Something went wrong. Let's try again!")
 
 
+@app.post("/ask-stream")
+async def ask_stream(request: AskRequest, background_tasks: BackgroundTasks):
+    """Same as /ask, but the answer is streamed as plain text while Claude writes it,
+    so the first words show up at first-token latency instead of after the full reply.
+    Logging, curation and telemetry run once the stream is complete."""
+    is_safe, safety_message = is_safe_topic(request.question)
+    if not is_safe:
+        return StreamingResponse(iter([safety_message]), media_type="text/plain; charset=utf-8")
+    
+    try:
+        language = await asyncio.to_thread(detect_language, request.question)
+        llm_request = _llm_request(request)
+        cache_key = _response_cache_key(llm_request)
+        cached = response_cache.get(cache_key) if cache_key else None
+        llm = None if cached is not None else app.state.llm or get_llm_backend()
+    except Exception:
+        logging.exception("ask-stream: failed")
+        raise HTTPException(status_code=500, detail="Something went wrong. Let's try again!")
+    
+    session_id = request.session_id or conversation_logger.start_session()
+    
+    async def relay():
+        if cached is not None:
+            yield cached
+            full_text = cached
+        else:
+            chunks = []
+            failed = False
+            async for chunk in llm.generate_stream(**llm_request):
+                failed = failed or isinstance(chunk, FailedReply)
+                if chunk:
+                    chunks.append(chunk)
+                    yield chunk
+            full_text = "".join(chunks).strip()
+            # Not a fallback, nor text cut off by a failed stream
+            if cache_key and full_text and not failed:
+                response_cache.set(cache_key, full_text)
+        _remember_exchange(request.session_id, llm_request, full_text)
+        # Background tasks added here still run: they start after the body is sent
+        await _record_exchange(background_tasks, session_id, request.question,
+                               full_text, language)
+    
+    return StreamingResponse(relay(), media_type="text/plain; charset=utf-8")
+
+
 
 class BeginNewTopicRequest(BaseModel):
     history: List[Message] = Field(default_factory=list)
+    session_id: Optional[str] = None
 
 
 @app.post("/begin-new-topic")
@@ -293,6 +719,9 @@ async def begin_new_topic(request: BeginNewTopicRequest = BeginNewTopicRequest()
     """Diana started a new topic. Consolidate recent.md into durable memory before
     the old thread's context decays away. Runs synchronously (it's a housekeeping
     call, not on the answer path) but, like /ask's curation, can never fail loudly."""
+    # The old topic must not follow the session into its next question
+    if request.session_id:
+        session_histories.pop(request.session_id)
     transcript = None
     if request.history:
         transcript = "\n".join(f"{msg.role}: {msg.content}" for msg in request.history[-30:])
@@ -320,7 +749,7 @@ def load_question_pool() -> List[str]:
     for path in (GENERATED_POOL_FILE, BASELINE_POOL_FILE):
         try:
             if path.exists():
-                questions = json.loads(path.read_text(encoding="utf-8")).get("questions") or []
+                questions = orjson.loads(path.read_bytes()).get("questions") or []
                 if questions:
                     return questions
         except Exception:
@@ -339,709 +768,139 @@ async def suggestions():
 @app.get("/settings", response_model=UserSettings)
 async def get_settings():
     """Get current user settings."""
-    return load_settings()
+    return await asyncio.to_thread(load_settings)
 
 
 @app.post("/settings", response_model=UserSettings)
 async def update_settings(settings: UserSettings):
     """Update user settings."""
-    save_settings(settings)
+    await asyncio.to_thread(save_settings, settings)
     return settings
 
 
 # Log viewer endpoints
 @app.get("/logs-data")
-async def get_logs_data():
-    """Get all conversation logs as JSON."""
-    logs_dir = Path("/app/logs")
-    all_logs = []
+async def get_logs_data(request: Request, limit: Optional[int] = Query(None, ge=1, le=1000),
+                        before: Optional[str] = None, session_id: Optional[str] = None):
+    """Conversation logs as JSON, with totals under "stats".
+
+    Without parameters every log is returned, streamed one log file at a time.
+    With limit/before/session_id it returns one page, newest first: pass the
+    page's next_before back as `before` to get the next one. That cursor is
+    "timestamp|n" (older than timestamp, or its n-th entry onwards), so entries
+    sharing a timestamp across a page boundary aren't skipped; a plain
+    timestamp returns only the entries strictly older."""
+    if limit is None and before is None and session_id is None:
+        # Files are kept pre-serialized, so a poll only encodes what is new
+        fragments, stats = await conversation_logger.read_logs_json()
+        # Files only ever grow, so their sizes plus the totals identify the body
+        # without hashing all of it; no-cache makes the browser revalidate
+        etag = f'"{hashlib.md5(orjson.dumps([stats, [len(f) for f in fragments]])).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        
+        def body():
+            yield b'{"logs":['
+            for i, fragment in enumerate(fragments):
+                yield b',' + fragment if i else fragment
+            yield b'],"stats":' + orjson.dumps(stats) + b'}'
+        
+        return StreamingResponse(body(), media_type="application/json", headers=headers)
     
-    if logs_dir.exists():
-        # Get all log files sorted by date
-        log_files = sorted(logs_dir.glob("conversations_*.jsonl"))
-        
-        for log_file in log_files:
-            with open(log_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    if line.strip():
-                        try:
-                            log_entry = json.loads(line)
-                            all_logs.append(log_entry)
-                        except json.JSONDecodeError:
-                            continue
+    before_ts, seen = before, None
+    if before is not None and "|" in before:
+        before_ts, _, count = before.rpartition("|")
+        seen = int(count) if count.isdigit() else 0
+    
+    log_files, stats = await conversation_logger.read_logs()
+    page = []
+    # Current timestamp, and how many entries with it have gone by (newest first)
+    run_ts, run = None, 0
+    for entries in reversed(log_files):
+        for entry in reversed(entries):
+            timestamp = entry.get("timestamp", "")
+            if timestamp != run_ts:
+                run_ts, run = timestamp, 0
+            run += 1
+            # ISO timestamps of one clock sort as strings
+            if before is not None and (timestamp > before_ts or timestamp == before_ts
+                                       and (seen is None or run <= seen)):
+                continue
+            if session_id is not None and entry.get("session_id") != session_id:
+                continue
+            page.append(entry)
+            if len(page) == limit:
+                break
+        if len(page) == limit:
+            break
+    next_before = f"{run_ts}|{run}" if limit is not None and len(page) == limit else None
+    return ORJSONResponse({"logs": page, "stats": stats, "next_before": next_before})
+
+
+# Comment lines sent on an idle /logs-stream, so proxies don't time it out
+LOGS_STREAM_KEEPALIVE = 15.0
+
+
+@app.get("/logs-stream")
+async def logs_stream():
+    """New log entries as Server-Sent Events (one JSON entry per event), so the
+    log viewer adds them as they happen instead of re-fetching /logs-data."""
+    queue = conversation_logger.subscribe()
+    
+    async def events():
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(queue.get(), LOGS_STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if line is None:
+                    return
+                yield b"data: " + line + b"\n\n"
+        finally:
+            conversation_logger.unsubscribe(queue)
     
-    return JSONResponse(content={"logs": all_logs})
+    # Content-Encoding set makes GZipMiddleware pass the stream through:
+    # gzip would hold each event back until enough output had built up
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "Content-Encoding": "identity",
+    })
+
+
+# The log viewer page is a static file, read once; an ETag lets the browser
+# revalidate it with a 304 instead of downloading it again
+LOGS_HTML_BYTES = (BASE_DIR / "static" / "logs.html").read_bytes()
+LOGS_HTML_ETAG = f'"{hashlib.md5(LOGS_HTML_BYTES).hexdigest()}"'
+LOGS_HTML_HEADERS = {"Cache-Control": "public, max-age=300", "ETag": LOGS_HTML_ETAG}
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check: the header may list several tags, or weak (W/) ones
+    when a proxy re-compressed the body."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
 
 
 @app.get("/logs", response_class=HTMLResponse)
-async def view_logs():
+async def view_logs(request: Request):
     """Serve the log viewer HTML page."""
-    html_content = """<!DOCTYPE html>
-<html lang="pt">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Soft Terminal - Visualizador de Logs</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: 'Lexend', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-            background: linear-gradient(180deg, #FEFFFF 0%, #F0F9FF 50%, #E5F4FF 100%);
-            color: #1e2846;
-            min-height: 100vh;
-            padding: 20px;
-        }
-        
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        
-        h1 {
-            color: #1e2846;
-            margin-bottom: 30px;
-            font-size: 32px;
-        }
-        
-        .stats {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        
-        .stat-card {
-            background: rgba(255, 255, 255, 0.8);
-            backdrop-filter: blur(8px);
-            border-radius: 12px;
-            padding: 20px;
-            box-shadow: 0 8px 24px rgba(20, 20, 40, 0.06);
-            border: 1px solid rgba(30, 40, 70, 0.08);
-        }
-        
-        .stat-value {
-            font-size: 36px;
-            font-weight: 600;
-            color: #5cd6b5;
-        }
-        
-        .stat-label {
-            color: #7A889B;
-            margin-top: 8px;
-        }
-        
-        .filters {
-            background: white;
-            border-radius: 12px;
-            padding: 20px;
-            margin-bottom: 30px;
-            box-shadow: 0 4px 14px rgba(20, 20, 40, 0.05);
-            display: flex;
-            gap: 20px;
-            flex-wrap: wrap;
-            align-items: center;
-        }
-        
-        .filter-group {
-            display: flex;
-            flex-direction: column;
-            gap: 8px;
-        }
-        
-        label {
-            font-size: 14px;
-            color: #7A889B;
-            font-weight: 500;
-        }
-        
-        input, select {
-            padding: 10px 14px;
-            border: 1px solid rgba(30, 40, 70, 0.10);
-            border-radius: 8px;
-            font-size: 16px;
-            font-family: inherit;
-            background: white;
-        }
-        
-        input:focus, select:focus {
-            outline: none;
-            box-shadow: 0 0 0 3px rgba(92, 214, 181, 0.2);
-        }
-        
-        button {
-            background: #5cd6b5;
-            color: white;
-            border: none;
-            border-radius: 999px;
-            padding: 10px 20px;
-            font-size: 16px;
-            font-weight: 500;
-            cursor: pointer;
-            transition: all 0.15s ease;
-        }
-        
-        button:hover {
-            transform: translateY(-1px);
-            box-shadow: 0 4px 12px rgba(92, 214, 181, 0.3);
-        }
-        
-        .logs-container {
-            background: white;
-            border-radius: 12px;
-            padding: 20px;
-            box-shadow: 0 4px 14px rgba(20, 20, 40, 0.05);
-            max-height: 600px;
-            overflow-y: auto;
-        }
-        
-        .log-entry {
-            border-bottom: 1px solid #f0f2f5;
-            padding: 20px 0;
-        }
-        
-        .log-entry:last-child {
-            border-bottom: none;
-        }
-        
-        .log-header {
-            display: flex;
-            align-items: center;
-            margin-bottom: 12px;
-        }
-        
-        .log-number {
-            background: #5cd6b5;
-            color: white;
-            padding: 2px 8px;
-            border-radius: 12px;
-            font-weight: 600;
-            margin-right: 8px;
-            font-size: 12px;
-        }
-        
-        .log-time {
-            font-size: 14px;
-            color: #7A889B;
-        }
-        
-        .log-session {
-            background: #F2FBF7;
-            color: #0d3b2a;
-            padding: 4px 8px;
-            border-radius: 4px;
-            font-size: 12px;
-            font-family: monospace;
-        }
-        
-        .log-question {
-            font-weight: 500;
-            margin-bottom: 8px;
-            color: #1e2846;
-        }
-        
-        .log-response {
-            color: #4A5568;
-            line-height: 1.6;
-            white-space: pre-wrap;
-        }
-        
-        .log-meta {
-            display: flex;
-            gap: 16px;
-            margin-top: 12px;
-            font-size: 12px;
-            color: #7A889B;
-        }
-        
-        .loading {
-            text-align: center;
-            padding: 40px;
-            color: #7A889B;
-        }
-        
-        .empty {
-            text-align: center;
-            padding: 40px;
-            color: #7A889B;
-        }
-        
-        /* Session grouping styles */
-        .session-group {
-            margin-bottom: 20px;
-            background: white;
-            border-radius: 12px;
-            overflow: hidden;
-            box-shadow: 0 4px 14px rgba(20, 20, 40, 0.05);
-        }
-        
-        .session-header {
-            padding: 16px 20px;
-            background: linear-gradient(90deg, #5cd6b5, #4fc7a8);
-            color: white;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            gap: 12px;
-            transition: background 0.2s;
-        }
-        
-        .session-header:hover {
-            background: linear-gradient(90deg, #4fc7a8, #42b89b);
-        }
-        
-        .session-toggle {
-            font-size: 14px;
-            width: 20px;
-        }
-        
-        .session-info {
-            flex: 1;
-        }
-        
-        .session-preview {
-            font-size: 14px;
-            opacity: 0.9;
-            max-width: 300px;
-            overflow: hidden;
-            text-overflow: ellipsis;
-            white-space: nowrap;
-        }
-        
-        .session-content {
-            padding: 0;
-        }
-        
-        /* Settings Section */
-        .settings-section {
-            background: white;
-            border-radius: 12px;
-            padding: 24px;
-            margin-bottom: 30px;
-            box-shadow: 0 4px 14px rgba(20, 20, 40, 0.05);
-        }
-        
-        .settings-section h2 {
-            color: #1e2846;
-            margin: 0 0 20px 0;
-            font-size: 24px;
-        }
-        
-        .settings-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin-bottom: 20px;
-        }
-        
-        .settings-field label {
-            display: block;
-            margin-bottom: 6px;
-            color: #7A889B;
-            font-size: 14px;
-            font-weight: 500;
-        }
-        
-        .settings-field input,
-        .settings-field select {
-            width: 100%;
-            padding: 10px 12px;
-            border: 1px solid #e5e5e5;
-            border-radius: 8px;
-            font-size: 16px;
-            transition: border-color 0.2s;
-        }
-        
-        .settings-field input:focus,
-        .settings-field select:focus {
-            outline: none;
-            border-color: #5cd6b5;
-            box-shadow: 0 0 0 3px rgba(92, 214, 181, 0.15);
-        }
-        
-        .save-settings {
-            background: #5cd6b5;
-            color: white;
-            border: none;
-            padding: 12px 24px;
-            border-radius: 8px;
-            font-size: 16px;
-            font-weight: 500;
-            cursor: pointer;
-            transition: all 0.2s;
-        }
-        
-        .save-settings:hover {
-            background: #4fc7a8;
-            transform: translateY(-1px);
-            box-shadow: 0 4px 12px rgba(92, 214, 181, 0.3);
-        }
-        
-        .settings-message {
-            margin-top: 12px;
-            padding: 12px;
-            border-radius: 8px;
-            display: none;
-        }
-        
-        .settings-message.success {
-            background: #d4edda;
-            color: #155724;
-            border: 1px solid #c3e6cb;
-            display: block;
-        }
-        
-        .settings-message.error {
-            background: #f8d7da;
-            color: #721c24;
-            border: 1px solid #f5c6cb;
-            display: block;
-        }
-        
-        @media (max-width: 640px) {
-            .filters {
-                flex-direction: column;
-                align-items: stretch;
-            }
-            
-            .filter-group {
-                width: 100%;
-            }
-            
-            input, select {
-                width: 100%;
-            }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>📊 Painel de Administração</h1>
-        
-        <!-- Settings Section -->
-        <div class="settings-section">
-            <h2>⚙️ Configurações da Criança</h2>
-            <div class="settings-grid">
-                <div class="settings-field">
-                    <label for="childName">Nome</label>
-                    <input type="text" id="childName" placeholder="Ex: Diana">
-                </div>
-                <div class="settings-field">
-                    <label for="childGender">Género</label>
-                    <select id="childGender">
-                        <option value="">Selecionar...</option>
-                        <option value="female">Menina</option>
-                        <option value="male">Menino</option>
-                        <option value="neutral">Neutro</option>
-                    </select>
-                </div>
-                <div class="settings-field">
-                    <label for="childDOB">Data de Nascimento</label>
-                    <input type="date" id="childDOB">
-                </div>
-                <button onclick="saveSettings()" class="save-settings">💾 Guardar Configurações</button>
-            </div>
-            <div id="settingsMessage" class="settings-message"></div>
-        </div>
-        
-        <hr style="margin: 30px 0; border: none; border-top: 1px solid #e5e5e5;">
-        
-        <h2>📈 Estatísticas</h2>
-        <div class="stats" id="stats">
-            <div class="stat-card">
-                <div class="stat-value" id="totalConversations">0</div>
-                <div class="stat-label">Total de Conversas</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-value" id="todayConversations">0</div>
-                <div class="stat-label">Conversas Hoje</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-value" id="uniqueSessions">0</div>
-                <div class="stat-label">Sessões Únicas</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-value" id="avgResponseLength">0</div>
-                <div class="stat-label">Tamanho Médio Resposta</div>
-            </div>
-        </div>
-        
-        <div class="filters">
-            <div class="filter-group">
-                <label for="dateFilter">Data</label>
-                <input type="date" id="dateFilter">
-            </div>
-            <div class="filter-group">
-                <label for="sessionFilter">Sessão</label>
-                <input type="text" id="sessionFilter" placeholder="ID da sessão">
-            </div>
-            <div class="filter-group">
-                <label for="languageFilter">Idioma</label>
-                <select id="languageFilter">
-                    <option value="">Todos</option>
-                    <option value="pt">Português</option>
-                    <option value="pt-PT">Português (PT)</option>
-                    <option value="en">English</option>
-                </select>
-            </div>
-            <div class="filter-group">
-                <label for="searchFilter">Pesquisar</label>
-                <input type="text" id="searchFilter" placeholder="Pesquisar perguntas...">
-            </div>
-            <button onclick="applyFilters()">Filtrar</button>
-            <button onclick="clearFilters()">Limpar</button>
-        </div>
-        
-        <div class="logs-container" id="logsContainer">
-            <div class="loading">A carregar conversas...</div>
-        </div>
-    </div>
-    
-    <script>
-        let allLogs = [];
-        let filteredLogs = [];
-        
-        // Load settings when page loads
-        async function loadSettings() {
-            try {
-                const response = await fetch('/settings');
-                if (response.ok) {
-                    const settings = await response.json();
-                    document.getElementById('childName').value = settings.name || '';
-                    document.getElementById('childGender').value = settings.gender || '';
-                    document.getElementById('childDOB').value = settings.date_of_birth || '';
-                }
-            } catch (error) {
-                console.error('Error loading settings:', error);
-            }
-        }
-        
-        // Save settings
-        async function saveSettings() {
-            const settings = {
-                name: document.getElementById('childName').value,
-                gender: document.getElementById('childGender').value,
-                date_of_birth: document.getElementById('childDOB').value
-            };
-            
-            try {
-                const response = await fetch('/settings', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify(settings)
-                });
-                
-                const messageDiv = document.getElementById('settingsMessage');
-                if (response.ok) {
-                    messageDiv.className = 'settings-message success';
-                    messageDiv.textContent = '✅ Configurações guardadas com sucesso!';
-                    setTimeout(() => {
-                        messageDiv.className = 'settings-message';
-                        messageDiv.textContent = '';
-                    }, 3000);
-                } else {
-                    messageDiv.className = 'settings-message error';
-                    messageDiv.textContent = '❌ Erro ao guardar configurações';
-                }
-            } catch (error) {
-                console.error('Error saving settings:', error);
-                const messageDiv = document.getElementById('settingsMessage');
-                messageDiv.className = 'settings-message error';
-                messageDiv.textContent = '❌ Erro ao guardar configurações';
-            }
-        }
-        
-        async function loadLogs() {
-            try {
-                const response = await fetch('/logs-data');
-                const data = await response.json();
-                allLogs = data.logs.sort((a, b) => 
-                    new Date(b.timestamp) - new Date(a.timestamp)
-                );
-                filteredLogs = allLogs;
-                updateStats();
-                renderLogs();
-            } catch (error) {
-                console.error('Error loading logs:', error);
-                document.getElementById('logsContainer').innerHTML = 
-                    '<div class="empty">Erro ao carregar conversas</div>';
-            }
-        }
-        
-        function updateStats() {
-            // Total conversations
-            document.getElementById('totalConversations').textContent = filteredLogs.length;
-            
-            // Today's conversations
-            const today = new Date().toISOString().split('T')[0];
-            const todayCount = filteredLogs.filter(log => 
-                log.timestamp.startsWith(today)
-            ).length;
-            document.getElementById('todayConversations').textContent = todayCount;
-            
-            // Unique sessions
-            const uniqueSessions = new Set(filteredLogs.map(log => log.session_id)).size;
-            document.getElementById('uniqueSessions').textContent = uniqueSessions;
-            
-            // Average response length
-            const avgLength = filteredLogs.length > 0
-                ? Math.round(filteredLogs.reduce((sum, log) => sum + log.response_length, 0) / filteredLogs.length)
-                : 0;
-            document.getElementById('avgResponseLength').textContent = avgLength;
-        }
-        
-        function renderLogs() {
-            const container = document.getElementById('logsContainer');
-            
-            if (filteredLogs.length === 0) {
-                container.innerHTML = '<div class="empty">Nenhuma conversa encontrada</div>';
-                return;
-            }
-            
-            // Group logs by session
-            const sessions = {};
-            filteredLogs.forEach(log => {
-                if (!sessions[log.session_id]) {
-                    sessions[log.session_id] = [];
-                }
-                sessions[log.session_id].push(log);
-            });
-            
-            // Sort sessions by most recent activity
-            const sortedSessions = Object.entries(sessions)
-                .sort(([,a], [,b]) => new Date(b[0].timestamp) - new Date(a[0].timestamp));
-            
-            // Render sessions
-            container.innerHTML = sortedSessions.map(([sessionId, logs], index) => {
-                // Sort logs within session by timestamp (oldest first for chronological order)
-                const chronologicalLogs = [...logs].sort((a, b) => 
-                    new Date(a.timestamp) - new Date(b.timestamp)
-                );
-                
-                const firstLog = chronologicalLogs[0];
-                const sessionDate = new Date(firstLog.timestamp);
-                const formattedDate = sessionDate.toLocaleDateString('pt-PT');
-                const formattedTime = sessionDate.toLocaleTimeString('pt-PT');
-                const isExpanded = index === 0; // Only expand the most recent session
-                
-                return `
-                    <div class="session-group">
-                        <div class="session-header" onclick="toggleSession('${sessionId}')">
-                            <span class="session-toggle" id="toggle-${sessionId}">${isExpanded ? '▼' : '▶'}</span>
-                            <span class="session-info">
-                                <strong>Sessão ${sessionId}</strong> - 
-                                ${formattedDate} às ${formattedTime} - 
-                                ${chronologicalLogs.length} pergunta${chronologicalLogs.length > 1 ? 's' : ''}
-                            </span>
-                            <span class="session-preview">${escapeHtml(firstLog.question.substring(0, 50))}...</span>
-                        </div>
-                        <div class="session-content" id="session-${sessionId}" style="display: ${isExpanded ? 'block' : 'none'}">
-                            ${chronologicalLogs.map((log, logIndex) => {
-                                const logDate = new Date(log.timestamp);
-                                const logTime = logDate.toLocaleTimeString('pt-PT');
-                                
-                                return `
-                                    <div class="log-entry">
-                                        <div class="log-header">
-                                            <span class="log-number">Q${logIndex + 1}</span>
-                                            <span class="log-time">${logTime}</span>
-                                        </div>
-                                        <div class="log-question">❓ ${escapeHtml(log.question)}</div>
-                                        <div class="log-response">💬 ${escapeHtml(log.response)}</div>
-                                        <div class="log-meta">
-                                            <span>🌐 ${log.language}</span>
-                                            <span>📏 ${log.response_length} caracteres</span>
-                                        </div>
-                                    </div>
-                                `;
-                            }).join('')}
-                        </div>
-                    </div>
-                `;
-            }).join('');
-        }
-        
-        function toggleSession(sessionId) {
-            const content = document.getElementById(`session-${sessionId}`);
-            const toggle = document.getElementById(`toggle-${sessionId}`);
-            
-            if (content.style.display === 'none') {
-                content.style.display = 'block';
-                toggle.textContent = '▼';
-            } else {
-                content.style.display = 'none';
-                toggle.textContent = '▶';
-            }
-        }
-        
-        function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
-        }
-        
-        function applyFilters() {
-            const dateFilter = document.getElementById('dateFilter').value;
-            const sessionFilter = document.getElementById('sessionFilter').value.toLowerCase();
-            const languageFilter = document.getElementById('languageFilter').value;
-            const searchFilter = document.getElementById('searchFilter').value.toLowerCase();
-            
-            filteredLogs = allLogs.filter(log => {
-                // Date filter
-                if (dateFilter && !log.timestamp.startsWith(dateFilter)) {
-                    return false;
-                }
-                
-                // Session filter
-                if (sessionFilter && !log.session_id.toLowerCase().includes(sessionFilter)) {
-                    return false;
-                }
-                
-                // Language filter
-                if (languageFilter && log.language !== languageFilter) {
-                    return false;
-                }
-                
-                // Search filter
-                if (searchFilter && 
-                    !log.question.toLowerCase().includes(searchFilter) && 
-                    !log.response.toLowerCase().includes(searchFilter)) {
-                    return false;
-                }
-                
-                return true;
-            });
-            
-            updateStats();
-            renderLogs();
-        }
-        
-        function clearFilters() {
-            document.getElementById('dateFilter').value = '';
-            document.getElementById('sessionFilter').value = '';
-            document.getElementById('languageFilter').value = '';
-            document.getElementById('searchFilter').value = '';
-            filteredLogs = allLogs;
-            updateStats();
-            renderLogs();
-        }
-        
-        // Load settings and logs on page load
-        loadSettings();
-        loadLogs();
-        
-        // Auto-refresh every 30 seconds
-        setInterval(loadLogs, 30000);
-    </script>
-</body>
-</html>"""
-    return HTMLResponse(content=html_content)
+    if _etag_matches(request, LOGS_HTML_ETAG):
+        return Response(status_code=304, headers=LOGS_HTML_HEADERS)
+    return HTMLResponse(content=LOGS_HTML_BYTES, headers=LOGS_HTML_HEADERS)
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # uvloop + httptools come with uvicorn[standard]. One worker on purpose: the
+    # log writer/cache, the curator's lock and the memory repo are per-process.
+    # Open /logs-stream connections are cut after 5s on shutdown, otherwise
+    # uvicorn waits on them forever and the log writer is never flushed.
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools",
+                timeout_graceful_shutdown=5)
\ No newline at end of file
@@ -237,11 +237,31 @@ def _cap(text: str, limit: int) -> str:
     return text if len(text) <= limit else text[:limit].rstrip() + "…"
 
 
+# (doc mtimes, context) of the last read_memory_context. The docs only change
+# when the curator writes them, so most calls just stat the four files.
+_context_cache: tuple = (None, "")
+
+
+def _context_key():
+    memory_dir = get_memory_dir()
+    try:
+        return memory_dir, tuple((memory_dir / name).stat().st_mtime_ns for name in SEED_CONTENT)
+    except FileNotFoundError:
+        return None
+
+
 def read_memory_context() -> str:
     """Compact 'what we know about Diana' block, appended to the system prompt on
     every /ask. Empty string if there's genuinely nothing (shouldn't happen once
-    the repo is seeded)."""
+    the repo is seeded). Re-read only when one of the docs has changed."""
+    global _context_cache
+    key = _context_key()
+    if key is not None and key == _context_cache[0]:
+        return _context_cache[1]
+
     ensure_memory_repo()
+    # Key taken before reading: a write racing the read just means a re-read next time
+    key = _context_key()
 
     sections = [
         _cap(read_doc(ABOUT_FILE), ABOUT_CAP),
@@ -250,4 +270,6 @@ def read_memory_context() -> str:
         _cap(read_doc(RECENT_FILE), RECENT_CAP),
     ]
     body = "\n\n".join(s for s in sections if s)
-    return f"\n\n## O que sabemos sobre a Diana\n\n{body}" if body else ""
+    context = f"\n\n## O que sabemos sobre a Diana\n\n{body}" if body else ""
+    _context_cache = (key, context)
+    return context
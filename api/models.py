@@ -1,22 +1,35 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Dict, Any, Literal
 
 
+# Request models strip surrounding whitespace from strings while validating, so
+# a blank question fails min_length instead of reaching the model
 class Message(BaseModel):
-    role: str  # 'user' or 'assistant'
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    # The only roles the Messages API accepts; anything else is a 422 here
+    # rather than an error from the API mid-request
+    role: Literal["user", "assistant"]
     content: str
 
 class AskRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     question: str = Field(..., min_length=1, max_length=2000)
-    history: List[Message] = Field(default_factory=list)
+    # None = not sent; an empty list means the conversation was cleared
+    history: Optional[List[Message]] = None
     session_id: Optional[str] = None
 
 
 class MoreRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     context_id: str = Field(..., min_length=8)
 
 
 class TTSRequest(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     text: str = Field(..., min_length=1, max_length=1000)
 
 
@@ -56,7 +56,7 @@ If asked in Portuguese, answer in Portuguese (Portugal) using "tu"."""
 KID_REWRITE_PROMPT = """Rewrite this answer for a curious 7-year-old. Two short sentences only, simple everyday words, no formulas or lists, friendly image or tiny story. Keep the same language as the input. If a hard word remains, add (means: simple explanation). Do not add 'Want more?'"""
 
 # Banlist of technical terms that should never appear
-TECHNICAL_BANLIST = {
+TECHNICAL_BANLIST = frozenset({
     'intersect', 'intersection', 'atmosphere', 'atmospheric', 'hydrides', 'hydride',
     'compound', 'compounds', 'molecule', 'molecules', 'molecular', 
     'react', 'reaction', 'reactions', 'approximate', 'approximately',
@@ -67,10 +67,10 @@ TECHNICAL_BANLIST = {
     'photosynthesis', 'synthesis', 'synthesize', 'degrees', 'angle', 'angles',
     'coefficient', 'density', 'mass', 'velocity', 'acceleration',
     'ch4', 'h2o', 'co2', 'o2', 'h2', 'ch3', 'nh3'  # Chemical formulas
-}
+})
 
-# Filler phrases to remove
-FILLER_PHRASES = [
+# Filler phrases to remove (a tuple, not a set: the first match is the one reported)
+FILLER_PHRASES = (
     "good thinking",
     "great question", 
     "i can provide",
@@ -89,7 +89,7 @@ FILLER_PHRASES = [
     "in fact",
     "want more?",
     "would you like to know more"
-]
+)
 
 # Simple word replacements
 SIMPLE_REPLACEMENTS = {
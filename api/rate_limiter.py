@@ -1,49 +1,63 @@
 """Rate limiting for API endpoints to prevent abuse."""
-from collections import defaultdict
-from datetime import datetime, timedelta
+from collections import defaultdict, deque
 from typing import Dict, Tuple
-import asyncio
+import time
 
 class RateLimiter:
-    """Simple in-memory rate limiter for child safety."""
-    
+    """Simple in-memory rate limiter for child safety.
+
+    No lock: neither check awaits anything, so on the event loop each one runs
+    start to finish without another request interleaving.
+    """
+
     def __init__(self, max_requests: int = 30, window_minutes: int = 10):
         self.max_requests = max_requests
-        self.window = timedelta(minutes=window_minutes)
-        self.requests: Dict[str, list] = defaultdict(list)
-        self._lock = asyncio.Lock()
-    
+        # Seconds on the monotonic clock: cheap float maths, and immune to
+        # wall-clock jumps (NTP sync on the Pi's first boot)
+        self.window_seconds = window_minutes * 60.0
+        # Request times per session, oldest first; never more than max_requests
+        self.requests: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.max_requests))
+        self._last_sweep = time.monotonic()
+
+    def _prune(self, requests: deque, now: float):
+        """Drop requests that left the window (they are in time order, so from the left)."""
+        cutoff = now - self.window_seconds
+        while requests and requests[0] <= cutoff:
+            requests.popleft()
+
+    def _sweep(self, now: float):
+        """Forget sessions with nothing left in the window, so the dict stays
+        the size of the active sessions rather than of every session ever seen."""
+        cutoff = now - self.window_seconds
+        for session_id in [sid for sid, requests in self.requests.items()
+                           if not requests or requests[-1] <= cutoff]:
+            del self.requests[session_id]
+        self._last_sweep = now
+
     async def check_rate_limit(self, session_id: str) -> Tuple[bool, str]:
         """Check if session has exceeded rate limit."""
-        async with self._lock:
-            now = datetime.now()
-            
-            # Clean old requests
-            if session_id in self.requests:
-                self.requests[session_id] = [
-                    req_time for req_time in self.requests[session_id]
-                    if now - req_time < self.window
-                ]
-            
-            # Check limit
-            if len(self.requests[session_id]) >= self.max_requests:
-                return False, "Too many questions! Take a break and come back in a few minutes 😊"
-            
-            # Record request
-            self.requests[session_id].append(now)
-            return True, ""
-    
+        now = time.monotonic()
+        # At most one sweep per window: O(sessions), amortized over the window's requests
+        if now - self._last_sweep >= self.window_seconds:
+            self._sweep(now)
+        requests = self.requests[session_id]
+        self._prune(requests, now)
+
+        # Check limit
+        if len(requests) >= self.max_requests:
+            return False, "Too many questions! Take a break and come back in a few minutes 😊"
+
+        # Record request
+        requests.append(now)
+        return True, ""
+
     async def get_remaining(self, session_id: str) -> int:
         """Get remaining requests for session."""
-        async with self._lock:
-            now = datetime.now()
-            if session_id in self.requests:
-                valid_requests = [
-                    req for req in self.requests[session_id]
-                    if now - req < self.window
-                ]
-                return max(0, self.max_requests - len(valid_requests))
-            return self.max_requests
+        if session_id in self.requests:
+            requests = self.requests[session_id]
+            self._prune(requests, time.monotonic())
+            return max(0, self.max_requests - len(requests))
+        return self.max_requests
 
 # Global rate limiter instance
-rate_limiter = RateLimiter()
\ No newline at end of file
+rate_limiter = RateLimiter()
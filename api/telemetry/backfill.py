@@ -10,7 +10,8 @@ constraints and ON CONFLICT DO NOTHING as the live push path in push.py):
 
 NOTE on the conversation logs: the real logs live on the Pi (see
 ConversationLogger in api/main.py - LOGS_DIR, default ~/soft-terminal-llm/logs,
-one conversations_YYYYMMDD.jsonl per day). The real backfill run happens THERE
+one conversations_YYYYMMDD.jsonl per day, gzipped to .jsonl.gz once the day
+is over). The real backfill run happens THERE
 at deploy time, with the default --logs-dir and --source=pi. For local
 testing, point --logs-dir at any local logs folder (this repo has
 logs/*.jsonl and api/logs/*.jsonl from earlier dev sessions) and pass
@@ -25,12 +26,14 @@ Usage:
 
 import argparse
 import glob
-import json
+import gzip
 import logging
 import os
 import sys
 from pathlib import Path
 
+import orjson
+
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from telemetry import push  # noqa: E402
 
@@ -42,17 +45,18 @@ DEFAULT_MEMORY_DIR = os.getenv("DIANA_MEMORY_DIR", "~/diana-memory")
 
 
 def backfill_conversations(logs_dir: Path, source: str) -> int:
-    files = sorted(glob.glob(str(logs_dir / "*.jsonl")))
+    files = sorted(glob.glob(str(logs_dir / "*.jsonl")) + glob.glob(str(logs_dir / "*.jsonl.gz")))
     pushed = 0
     for path in files:
-        with open(path, encoding="utf-8") as f:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
             for line_num, line in enumerate(f, 1):
                 line = line.strip()
                 if not line:
                     continue
                 try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
                     logger.warning("skipping unparseable line %d in %s", line_num, path)
                     continue
                 push.push_conversation(
@@ -71,7 +75,7 @@ def main():
     parser = argparse.ArgumentParser(
         description="Backfill Supabase telemetry from local logs + the diana-memory repo."
     )
-    parser.add_argument("--logs-dir", default=DEFAULT_LOGS_DIR, help="Directory of conversations_*.jsonl files")
+    parser.add_argument("--logs-dir", default=DEFAULT_LOGS_DIR, help="Directory of conversations_*.jsonl(.gz) files")
     parser.add_argument("--memory-dir", default=DEFAULT_MEMORY_DIR, help="Path to the diana-memory git repo")
     parser.add_argument("--source", default="pi", choices=["pi", "local"], help="Tag conversations rows with this source")
     parser.add_argument("--skip-conversations", action="store_true")
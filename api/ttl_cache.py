@@ -0,0 +1,48 @@
+"""Small in-memory LRU cache whose entries also expire after a fixed time."""
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+import logging
+import time
+
+logger = logging.getLogger("cache")
+
+
+class TTLCache:
+    """Bounded LRU mapping; an entry is dropped `ttl` seconds after it was set.
+
+    Only used from the event loop, so it needs no lock.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: str = "cache"):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Value for key (marking it recently used), or default if missing/expired."""
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires, value = item
+        if expires <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store value, evicting the least recently used entry when full."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            evicted, _ = self._data.popitem(last=False)
+            # Evictions before expiry mean maxsize is too small for the load
+            logger.debug("%s: full (%d), evicted %r", self.name, self.maxsize, evicted)
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def __len__(self) -> int:
+        return len(self._data)
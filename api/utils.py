@@ -1,12 +1,33 @@
 import re
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
 from nanoid import generate
 
 
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_DEGREES_RE = re.compile(r'\b\d+\s*degrees?\b', re.IGNORECASE)
+_APPROX_RE = re.compile(r'\bapproximately\s+\d+\b', re.IGNORECASE)
+
+
 def generate_context_id() -> str:
     return generate(size=12)
 
 
+def _iter_segments(text: str, max_chunk_size: int) -> Iterator[Tuple[str, str]]:
+    """Yield (separator, segment) pairs: sentences, falling back to comma
+    parts and then words for anything longer than max_chunk_size."""
+    for sentence in _SENTENCE_SPLIT_RE.split(text):
+        if len(sentence) <= max_chunk_size:
+            yield " ", sentence
+            continue
+        for part in sentence.split(', '):
+            if len(part) <= max_chunk_size:
+                yield ", ", part
+            else:
+                for word in part.split():
+                    yield " ", word
+
+
 def chunk_text(text: str, max_chunk_size: int = 200) -> List[str]:
     """Break text into chunks of approximately max_chunk_size characters."""
     text = text.strip()
@@ -14,141 +35,144 @@ def chunk_text(text: str, max_chunk_size: int = 200) -> List[str]:
     if not text:
         return []
     
-    # Split by sentences first
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    
+    # Greedy packing; pieces are joined once per chunk rather than by
+    # repeated string concatenation
     chunks = []
-    current_chunk = ""
-    
-    for sentence in sentences:
-        # If single sentence is too long, break it by commas or spaces
-        if len(sentence) > max_chunk_size:
-            # Try to break by commas first
-            parts = sentence.split(', ')
-            for part in parts:
-                if len(part) > max_chunk_size:
-                    # Break by words as last resort
-                    words = part.split()
-                    for word in words:
-                        if len(current_chunk) + len(word) + 1 > max_chunk_size:
-                            if current_chunk:
-                                chunks.append(current_chunk.strip())
-                                current_chunk = word
-                        else:
-                            current_chunk += (" " + word if current_chunk else word)
-                else:
-                    if len(current_chunk) + len(part) + 2 > max_chunk_size:
-                        if current_chunk:
-                            chunks.append(current_chunk.strip())
-                            current_chunk = part
-                    else:
-                        current_chunk += (", " + part if current_chunk else part)
+    parts = []
+    current_len = 0
+    
+    for separator, segment in _iter_segments(text, max_chunk_size):
+        # A chunk holding no text yet (nothing, or only the empty part before a
+        # leading ", ") takes the segment without a separator in front
+        if current_len and current_len + len(separator) + len(segment) > max_chunk_size:
+            chunks.append("".join(parts).strip())
+            parts = [segment]
+            current_len = len(segment)
+        elif current_len:
+            parts += (separator, segment)
+            current_len += len(separator) + len(segment)
         else:
-            # Try to add sentence to current chunk
-            if len(current_chunk) + len(sentence) + 1 > max_chunk_size:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                    current_chunk = sentence
-            else:
-                current_chunk += (" " + sentence if current_chunk else sentence)
+            parts = [segment]
+            current_len = len(segment)
     
-    # Add remaining chunk
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+    if current_len:
+        chunks.append("".join(parts).strip())
     
     return chunks
 
 
+# format_for_kid: complex words and phrases -> simpler ones. Separate from
+# prompts.SIMPLE_REPLACEMENTS, which also carries PT-PT vocabulary swaps
+_SIMPLE_REPLACEMENTS = {
+    # Technical terms
+    "intersect": "meet",
+    "intersection": "meeting point",
+    "approximately": "about",
+    "degrees": "amount",
+    "40 degrees": "halfway up",
+    "42 degrees": "halfway up", 
+    "angle": "tilt",
+    "reflect": "bounce",
+    "reflection": "bouncing",
+    "refract": "bend",
+    "refraction": "bending",
+    "spectrum": "spread of colors",
+    "phenomenon": "thing that happens",
+    "natural phenomenon": "something nature does",
+    "occur": "happen",
+    "occurs": "happens",
+    "particles": "tiny bits",
+    "molecules": "tiny pieces",
+    "vibration": "shaking",
+    "vibrating": "shaking",
+    "frequency": "speed",
+    "low-frequency": "slow",
+    "high-frequency": "fast",
+    "communicate": "talk",
+    "produce": "make",
+    "produced": "made",
+    "creates": "makes",
+    "forming": "making",
+    "appears": "shows up",
+    "alternate": "take turns",
+    "ice crystals": "tiny ice pieces",
+    "water droplets": "tiny water drops",
+    "sunlight": "light from the sun",
+    "upper atmosphere": "high up in the sky",
+    "atmosphere": "the air around Earth",
+    
+    # Simplify complex explanations
+    "at an angle of": "tilted at",
+    "reflects off": "bounces off",
+    "passes through": "goes through",
+    "interacts with": "meets",
+    "consists of": "is made of",
+    "as a result": "so",
+    "due to": "because of",
+    "in order to": "to",
+    
+    # Add friendly tone
+    "The reason": "Here's why",
+    "This is because": "That's because",
+    "In fact": "Actually",
+    "Therefore": "So",
+    "However": "But",
+}
+
+# Complex words that stay, with an explanation added
+_COMPLEX_WORDS = {
+    "volcano": "volcano (means: mountain that shoots hot rock)",
+    "photosynthesis": "photosynthesis (means: how plants make food)",
+    "gravity": "gravity (means: what pulls things down)",
+    "ecosystem": "ecosystem (means: animals and plants living together)",
+    "energy": "energy (means: power to do things)",
+    "oxygen": "oxygen (means: air we breathe)",
+    "carbon dioxide": "carbon dioxide (means: air we breathe out)",
+    "magma": "magma (means: melted rock)",
+    "lava": "lava (means: hot melted rock)",
+    "molten": "melted",
+    "crust": "outer layer",
+    "Earth's crust": "Earth's outer layer",
+    "eruption": "explosion",
+    "volcanic eruption": "volcano explosion",
+}
+
+
+def _alternation_re(words) -> re.Pattern:
+    """One case-insensitive pass matching any of the words; longest first, so a
+    phrase ("natural phenomenon") wins over a word inside it ("phenomenon")."""
+    return re.compile(
+        r'\b(?:' + '|'.join(re.escape(w) for w in sorted(words, key=len, reverse=True)) + r')\b',
+        re.IGNORECASE
+    )
+
+
+def _replace_all(pattern: re.Pattern, table: Dict[str, str], text: str) -> str:
+    # table is keyed by casefolded word, which also covers the odd non-ASCII
+    # letter IGNORECASE treats as equal (e.g. 'ſ' for 's')
+    return pattern.sub(lambda m: table.get(m.group().casefold(), m.group()), text)
+
+
+_SIMPLE_RE = _alternation_re(_SIMPLE_REPLACEMENTS)
+_SIMPLE_FOLDED = {k.casefold(): v for k, v in _SIMPLE_REPLACEMENTS.items()}
+_COMPLEX_RE = _alternation_re(_COMPLEX_WORDS)
+_COMPLEX_FOLDED = {k.casefold(): v for k, v in _COMPLEX_WORDS.items()}
+
+
+# Not called by the API at the moment (answers are passed through as Claude
+# wrote them); kept for reuse
 def format_for_kid(text: str) -> str:
     """Apply kid-friendly formatting to text."""
     
     # First, replace complex words and phrases with simpler ones
-    simple_replacements = {
-        # Technical terms
-        "intersect": "meet",
-        "intersection": "meeting point",
-        "approximately": "about",
-        "degrees": "amount",
-        "40 degrees": "halfway up",
-        "42 degrees": "halfway up", 
-        "angle": "tilt",
-        "reflect": "bounce",
-        "reflection": "bouncing",
-        "refract": "bend",
-        "refraction": "bending",
-        "spectrum": "spread of colors",
-        "phenomenon": "thing that happens",
-        "natural phenomenon": "something nature does",
-        "occur": "happen",
-        "occurs": "happens",
-        "particles": "tiny bits",
-        "molecules": "tiny pieces",
-        "vibration": "shaking",
-        "vibrating": "shaking",
-        "frequency": "speed",
-        "low-frequency": "slow",
-        "high-frequency": "fast",
-        "communicate": "talk",
-        "produce": "make",
-        "produced": "made",
-        "creates": "makes",
-        "forming": "making",
-        "appears": "shows up",
-        "alternate": "take turns",
-        "ice crystals": "tiny ice pieces",
-        "water droplets": "tiny water drops",
-        "sunlight": "light from the sun",
-        "upper atmosphere": "high up in the sky",
-        "atmosphere": "the air around Earth",
-        
-        # Simplify complex explanations
-        "at an angle of": "tilted at",
-        "reflects off": "bounces off",
-        "passes through": "goes through",
-        "interacts with": "meets",
-        "consists of": "is made of",
-        "as a result": "so",
-        "due to": "because of",
-        "in order to": "to",
-        
-        # Add friendly tone
-        "The reason": "Here's why",
-        "This is because": "That's because",
-        "In fact": "Actually",
-        "Therefore": "So",
-        "However": "But",
-    }
-    
-    result = text
-    
-    # Apply simple replacements
-    for complex, simple in simple_replacements.items():
-        result = re.sub(rf'\b{complex}\b', simple, result, flags=re.IGNORECASE)
+    result = _replace_all(_SIMPLE_RE, _SIMPLE_FOLDED, text)
     
     # Add explanations for remaining complex words
-    complex_words = {
-        "volcano": "volcano (means: mountain that shoots hot rock)",
-        "photosynthesis": "photosynthesis (means: how plants make food)",
-        "gravity": "gravity (means: what pulls things down)",
-        "ecosystem": "ecosystem (means: animals and plants living together)",
-        "energy": "energy (means: power to do things)",
-        "oxygen": "oxygen (means: air we breathe)",
-        "carbon dioxide": "carbon dioxide (means: air we breathe out)",
-        "magma": "magma (means: melted rock)",
-        "lava": "lava (means: hot melted rock)",
-        "molten": "melted",
-        "crust": "outer layer",
-        "Earth's crust": "Earth's outer layer",
-        "eruption": "explosion",
-        "volcanic eruption": "volcano explosion",
-    }
-    
-    for word, replacement in complex_words.items():
-        result = re.sub(rf'\b{word}\b', replacement, result, flags=re.IGNORECASE)
+    result = _replace_all(_COMPLEX_RE, _COMPLEX_FOLDED, result)
     
     # Clean up any remaining technical language
-    result = re.sub(r'\b\d+\s*degrees?\b', 'partway up', result, flags=re.IGNORECASE)
-    result = re.sub(r'\bapproximately\s+\d+\b', 'about halfway', result, flags=re.IGNORECASE)
+    result = _DEGREES_RE.sub('partway up', result)
+    result = _APPROX_RE.sub('about halfway', result)
     
     # Make sentences more conversational
     if not result.endswith(("!", "?", "Want more?")):
@@ -158,19 +182,21 @@ def format_for_kid(text: str) -> str:
     return result
 
 
+# Simple denylist for inappropriate topics, matched anywhere in the question
+# (substrings, like the old per-keyword `in` checks) in one scan
+_UNSAFE_KEYWORDS = (
+    "violence", "death", "kill", "murder", "suicide",
+    "drug", "alcohol", "cigarette", "smoke",
+    "sex", "adult", "inappropriate"
+)
+_UNSAFE_RE = re.compile("|".join(map(re.escape, _UNSAFE_KEYWORDS)))
+
+
+@lru_cache(maxsize=4096)
 def is_safe_topic(question: str) -> Tuple[bool, str]:
     """Check if topic is appropriate for kids."""
-    # Simple denylist for inappropriate topics
-    unsafe_keywords = [
-        "violence", "death", "kill", "murder", "suicide",
-        "drug", "alcohol", "cigarette", "smoke",
-        "sex", "adult", "inappropriate"
-    ]
-    
-    question_lower = question.lower()
-    for keyword in unsafe_keywords:
-        if keyword in question_lower:
-            return False, "Let's ask an adult together about that."
+    if _UNSAFE_RE.search(question.lower()):
+        return False, "Let's ask an adult together about that."
     
     return True, ""
 
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# api/ modules import each other by bare name (as uvicorn runs them from api/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "api"))
+
+# main reads these at import time; keep logs, settings and memory out of the repo
+_TMP = tempfile.mkdtemp(prefix="eli7-tests-")
+os.environ.setdefault("LOGS_DIR", os.path.join(_TMP, "logs"))
+os.environ.setdefault("SETTINGS_FILE", os.path.join(_TMP, "settings.json"))
+os.environ.setdefault("DIANA_MEMORY_DIR", os.path.join(_TMP, "memory"))
@@ -0,0 +1,119 @@
+"""Unit tests for ConversationLogger's incremental log reader (api/main.py)
+Run with: python -m pytest tests/
+"""
+import orjson
+import pytest
+
+import main
+from main import ConversationLogger
+
+
+@pytest.fixture
+def logger(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOGS_DIR", str(tmp_path))
+    return ConversationLogger()
+
+
+def _entry(n, session_id="s1"):
+    return {"session_id": session_id, "timestamp": f"2026-10-14T10:00:{n:02d}",
+            "question": f"q{n}", "response": "r", "response_length": 1}
+
+
+def _append(path, data):
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def _line(n, **kwargs):
+    return orjson.dumps(_entry(n, **kwargs)) + b"\n"
+
+
+def _questions(logger):
+    logger._read_new_entries()
+    return [entry["question"] for log_file in sorted(logger._entries)
+            for entry in logger._entries[log_file]]
+
+
+def test_compressed_mid_read_is_picked_up_from_the_gz(logger, monkeypatch):
+    log_file = logger.logs_dir / "conversations_20261014.jsonl"
+    _append(log_file, _line(1))
+    assert _questions(logger) == ["q1"]
+    _append(log_file, _line(2))
+    # Day rollover compresses the file between the stat and the open
+    real_open = open
+
+    def open_after_rollover(path, *args, **kwargs):
+        if path == log_file:
+            monkeypatch.setattr(main, "open", real_open, raising=False)
+            ConversationLogger._compress(log_file)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(main, "open", open_after_rollover, raising=False)
+    assert _questions(logger) == ["q1"]
+    monkeypatch.undo()
+    # The stale .jsonl state is dropped and the day is read back from the .gz
+    assert _questions(logger) == ["q1", "q2"]
+    assert list(logger._offsets) == [log_file.with_name(log_file.name + ".gz")]
+    assert logger._summary()["total"] == 2
+
+
+def test_deleted_log_file_is_dropped(logger):
+    log_file = logger.logs_dir / "conversations_20261014.jsonl"
+    _append(log_file, _line(1))
+    _append(logger.logs_dir / "conversations_20261015.jsonl", _line(2))
+    assert _questions(logger) == ["q1", "q2"]
+    log_file.unlink()
+    assert _questions(logger) == ["q2"]
+    assert log_file not in logger._offsets
+    assert logger._summary()["total"] == 1
+
+
+def test_only_appended_bytes_are_parsed(logger, monkeypatch):
+    log_file = logger.logs_dir / "conversations_20261014.jsonl"
+    _append(log_file, _line(1) + _line(2))
+    assert _questions(logger) == ["q1", "q2"]
+    assert logger._offsets[log_file] == log_file.stat().st_size
+    _append(log_file, _line(3))
+    parsed = []
+    loads = orjson.loads
+    monkeypatch.setattr(main.orjson, "loads", lambda line: parsed.append(line) or loads(line))
+    assert _questions(logger) == ["q1", "q2", "q3"]
+    assert parsed == [_line(3)[:-1]]
+    # Nothing new: nothing parsed
+    assert _questions(logger) == ["q1", "q2", "q3"]
+    assert len(parsed) == 1
+
+
+def test_truncated_or_replaced_file_is_read_again(logger):
+    log_file = logger.logs_dir / "conversations_20261014.jsonl"
+    _append(log_file, _line(1) + _line(2))
+    assert _questions(logger) == ["q1", "q2"]
+    log_file.write_bytes(_line(3))
+    assert _questions(logger) == ["q3"]
+    assert logger._summary()["total"] == 1
+    # Replaced by a new file that is shorter than what was read
+    replacement = log_file.with_name("replacement")
+    replacement.write_bytes(b'{"question":"q4"}\n')
+    replacement.replace(log_file)
+    assert _questions(logger) == ["q4"]
+    log_file.write_bytes(b"")
+    assert _questions(logger) == []
+    _append(log_file, _line(5))
+    assert _questions(logger) == ["q5"]
+
+
+def test_partial_line_waits_for_its_newline(logger):
+    log_file = logger.logs_dir / "conversations_20261014.jsonl"
+    line = _line(2)
+    _append(log_file, _line(1) + line[:10])
+    assert _questions(logger) == ["q1"]
+    assert logger._offsets[log_file] == len(_line(1))
+    _append(log_file, line[10:])
+    assert _questions(logger) == ["q1", "q2"]
+    assert logger._summary()["total"] == 2
+
+
+def test_corrupt_lines_are_skipped(logger):
+    log_file = logger.logs_dir / "conversations_20261014.jsonl"
+    _append(log_file, _line(1) + b"not json\n\n[1]\n" + _line(2))
+    assert _questions(logger) == ["q1", "q2"]
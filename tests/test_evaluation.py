@@ -0,0 +1,21 @@
+"""Unit tests for api/evaluation.py
+Run with: python -m pytest tests/
+"""
+from evaluation import ResponseEvaluator
+
+
+class _StrictEvaluator(ResponseEvaluator):
+    TECHNICAL_TERMS = frozenset({"rainbow"})
+
+
+def test_evaluate_cache_is_per_instance():
+    response = "The rainbow is pretty. Want more?"
+    assert ResponseEvaluator().evaluate(response).technical_terms_found == []
+    # Same text, already cached by the default evaluator above
+    assert _StrictEvaluator().evaluate(response).technical_terms_found == ["rainbow"]
+
+
+def test_evaluate_returns_fresh_lists():
+    evaluator = ResponseEvaluator()
+    evaluator.evaluate("Atoms are tiny.").technical_terms_found.append("mutated")
+    assert evaluator.evaluate("Atoms are tiny.").technical_terms_found == ["atom"]
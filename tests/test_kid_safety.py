@@ -0,0 +1,31 @@
+"""Unit tests for api/kid_safety.py
+Run with: python -m pytest tests/
+"""
+import pytest
+
+from kid_safety import _guess_language, detect_language
+
+
+@pytest.mark.parametrize("text, language", [
+    ("Porque é que o céu é azul?", "pt"),
+    ("O que é um vulcão?", "pt"),
+    ("Tu sabes onde vivem os pinguins?", "pt-PT"),
+    ("Why is the sky blue?", "en"),
+    ("What is a volcano?", "en"),
+    ("¿Por qué el cielo es azul?", "es"),
+    ("¿Dónde viven los pingüinos?", "es"),
+    # Only words Spanish shares with Portuguese: not enough for the markers
+    ("Como está tu perro?", "es"),
+    ("Como está el tiempo hoy? Que bonito es el mar", "es"),
+])
+def test_detect_language(text, language):
+    assert detect_language(text) == language
+
+
+@pytest.mark.parametrize("text", [
+    "como está el tiempo hoy? que bonito es el mar",
+    "como está tu perro?",
+    "¿para qué sirve la luna?",
+])
+def test_guess_language_leaves_spanish_to_langdetect(text):
+    assert _guess_language(text) is None
@@ -0,0 +1,16 @@
+"""Unit tests for api/llm_interface.py
+Run with: python -m pytest tests/
+"""
+from llm_interface import _cached_system
+
+
+def test_cached_system_marks_only_the_invariant_block():
+    blocks = _cached_system(["invariant", "date, settings and memory"])
+    assert blocks[0] == {"type": "text", "text": "invariant", "cache_control": {"type": "ephemeral"}}
+    assert blocks[1] == {"type": "text", "text": "date, settings and memory"}
+
+
+def test_cached_system_accepts_a_single_string():
+    assert _cached_system("prompt") == [
+        {"type": "text", "text": "prompt", "cache_control": {"type": "ephemeral"}}
+    ]
@@ -0,0 +1,195 @@
+"""Endpoint tests for api/main.py (no network: the LLM and curator are faked)
+Run with: python -m pytest tests/
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+import curator
+import main
+from llm_interface import LLMInterface
+from ttl_cache import TTLCache
+
+
+class FakeLLM(LLMInterface):
+    """Answers "answer N" to the Nth call and records what each call was given."""
+
+    def __init__(self):
+        self.calls = []
+        self.error = False
+
+    async def generate(self, system, user, history=None, max_tokens=150, temperature=0.7):
+        self.calls.append({"system": system, "user": user, "history": list(history or ())})
+        return {"text": f"answer {len(self.calls)}", "searched": False, "error": self.error}
+
+
+async def _noop(*args, **kwargs):
+    pass
+
+
+@pytest.fixture
+def llm():
+    return FakeLLM()
+
+
+@pytest.fixture
+def client(monkeypatch, llm):
+    monkeypatch.setattr(curator, "curate_exchange", _noop)
+    monkeypatch.setattr(curator, "curate_topic_boundary", _noop)
+    monkeypatch.setattr(main, "session_histories", TTLCache(maxsize=256, ttl=3600))
+    monkeypatch.setattr(main, "response_cache", TTLCache(maxsize=2048, ttl=3600))
+    with TestClient(main.app) as client:
+        main.app.state.llm = llm
+        yield client
+
+
+def _ask(client, question, **body):
+    response = client.post("/ask", json={"question": question, **body})
+    assert response.status_code == 200
+    return response.json()["response"]
+
+
+def test_session_history_is_kept_server_side(client, llm):
+    session_id = client.post("/new-session").json()["session_id"]
+    _ask(client, "Why is the sky blue?", session_id=session_id)
+    # The client's copy is ignored while the server has one
+    _ask(client, "And the sea?", session_id=session_id,
+         history=[{"role": "user", "content": "something else"}])
+    assert llm.calls[1]["history"] == [
+        {"role": "user", "content": "Why is the sky blue?"},
+        {"role": "assistant", "content": "answer 1"},
+    ]
+
+
+def test_empty_client_history_clears_the_server_copy(client, llm):
+    session_id = client.post("/new-session").json()["session_id"]
+    _ask(client, "Why is the sky blue?", session_id=session_id)
+    _ask(client, "Do cats dream?", session_id=session_id, history=[])
+    assert llm.calls[1]["history"] == []
+
+
+def test_begin_new_topic_drops_the_session_history(client, llm):
+    session_id = client.post("/new-session").json()["session_id"]
+    _ask(client, "Why is the sky blue?", session_id=session_id)
+    assert client.post("/begin-new-topic", json={"session_id": session_id}).json() == {"ok": True}
+    _ask(client, "Do cats dream?", session_id=session_id)
+    assert llm.calls[1]["history"] == []
+
+
+def test_begin_new_topic_without_a_body(client):
+    assert client.post("/begin-new-topic").json() == {"ok": True}
+
+
+@pytest.mark.parametrize("session_id", ["unknown", None])
+def test_unknown_session_falls_back_to_client_history(client, llm, session_id):
+    history = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello!"}]
+    _ask(client, "Do cats dream?", session_id=session_id, history=history)
+    assert llm.calls[0]["history"] == history
+
+
+def test_expired_session_falls_back_to_client_history(client, llm, monkeypatch):
+    session_id = client.post("/new-session").json()["session_id"]
+    _ask(client, "Why is the sky blue?", session_id=session_id)
+    monkeypatch.setattr(main.session_histories, "ttl", 0)
+    # Re-set the entry with the new ttl: it is expired on the next get
+    main.session_histories.set(session_id, main.session_histories.get(session_id))
+    history = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello!"}]
+    _ask(client, "Do cats dream?", session_id=session_id, history=history)
+    assert llm.calls[1]["history"] == history
+
+
+def test_repeated_first_question_is_answered_from_cache(client, llm, monkeypatch):
+    assert _ask(client, "Why is the sky blue?") == "answer 1"
+    # Memory changes after every exchange; it is not part of the key
+    monkeypatch.setattr(main, "read_memory_context", lambda: "\n\nnew memory")
+    assert _ask(client, "  why is the SKY blue?") == "answer 1"
+    assert len(llm.calls) == 1
+
+
+def test_different_question_misses_the_cache(client, llm):
+    _ask(client, "Why is the sky blue?")
+    assert _ask(client, "Why is the sea blue?") == "answer 2"
+
+
+def test_follow_up_questions_are_not_cached(client, llm):
+    session_id = client.post("/new-session").json()["session_id"]
+    _ask(client, "Why is the sky blue?", session_id=session_id)
+    _ask(client, "Why?", session_id=session_id)
+    # Same follow-up in another conversation: answered fresh
+    _ask(client, "Do cats dream?", session_id=None)
+    assert _ask(client, "Why?", history=[
+        {"role": "user", "content": "Do cats dream?"}, {"role": "assistant", "content": "answer 3"},
+    ]) == "answer 4"
+
+
+def test_failed_replies_are_not_cached(client, llm):
+    llm.error = True
+    _ask(client, "Why is the sky blue?")
+    llm.error = False
+    assert _ask(client, "Why is the sky blue?") == "answer 2"
+
+
+def test_cached_answers_expire(client, llm, monkeypatch):
+    monkeypatch.setattr(main.response_cache, "ttl", 0)
+    _ask(client, "Why is the sky blue?")
+    assert _ask(client, "Why is the sky blue?") == "answer 2"
+
+
+def test_stream_shares_the_cache(client, llm):
+    _ask(client, "Why is the sky blue?")
+    response = client.post("/ask-stream", json={"question": "Why is the sky blue?"})
+    assert response.text == "answer 1"
+    assert len(llm.calls) == 1
+
+
+def test_logs_data_revalidates_with_etag(client):
+    response = client.get("/logs-data")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+    assert client.get("/logs-data", headers={"If-None-Match": etag}).status_code == 304
+    # A proxy that re-compressed the body sends it back weak
+    assert client.get("/logs-data", headers={"If-None-Match": f'"x", W/{etag}'}).status_code == 304
+
+    with open(main.conversation_logger.logs_dir / "conversations_20261014.jsonl", "ab") as f:
+        f.write(b'{"session_id":"etag","timestamp":"2026-10-14T09:00:00","response_length":2}\n')
+    response = client.get("/logs-data", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert "etag" in {entry["session_id"] for entry in response.json()["logs"]}
+
+
+def _page(client, **params):
+    response = client.get("/logs-data", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_logs_data_pages_through_equal_timestamps(client, monkeypatch):
+    log_files = [[
+        {"session_id": "a", "timestamp": "2026-10-14T10:00:00", "question": "q1"},
+        {"session_id": "b", "timestamp": "2026-10-14T10:00:01", "question": "q2"},
+        {"session_id": "a", "timestamp": "2026-10-14T10:00:01", "question": "q3"},
+        {"session_id": "b", "timestamp": "2026-10-14T10:00:01", "question": "q4"},
+        {"session_id": "a", "timestamp": "2026-10-14T10:00:02", "question": "q5"},
+    ]]
+
+    async def read_logs():
+        return log_files, {}
+
+    monkeypatch.setattr(main.conversation_logger, "read_logs", read_logs)
+    questions, params = [], {"limit": 2}
+    while True:
+        page = _page(client, **params)
+        questions += [entry["question"] for entry in page["logs"]]
+        if not page["next_before"]:
+            break
+        params["before"] = page["next_before"]
+    assert questions == ["q5", "q4", "q3", "q2", "q1"]
+
+    page = _page(client, limit=1, session_id="a", before="2026-10-14T10:00:02|1")
+    assert [entry["question"] for entry in page["logs"]] == ["q3"]
+    page = _page(client, limit=5, session_id="a", before=page["next_before"])
+    assert [entry["question"] for entry in page["logs"]] == ["q1"]
+    # A plain timestamp still means strictly older
+    page = _page(client, limit=5, before="2026-10-14T10:00:01")
+    assert [entry["question"] for entry in page["logs"]] == ["q1"]
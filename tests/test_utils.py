@@ -0,0 +1,26 @@
+"""Unit tests for api/utils.py
+Run with: python -m pytest tests/
+"""
+from utils import chunk_text, format_for_kid
+
+
+def test_chunk_text_empty_comma_part_does_not_start_a_chunk():
+    # ", h, g?" splits into ['', 'h', 'g?']: the empty part must not leave
+    # a chunk starting with ", " or shift the packing
+    assert chunk_text("bb f! , h, g? h, h", 5) == ["bb f!", "h, g?", "h, h"]
+
+
+def test_chunk_text_empty_comma_part_inside_a_chunk_matches_baseline():
+    assert chunk_text("aaaa bbbb cccc, , dd", 18) == ["aaaa bbbb cccc,", "dd"]
+    assert chunk_text("aaaa bbbb cccc, , dd. x", 22) == ["aaaa bbbb cccc, , dd.", "x"]
+
+
+def test_chunk_text_packs_sentences():
+    assert chunk_text("One. Two! Three?", 10) == ["One. Two!", "Three?"]
+    assert chunk_text("   ", 10) == []
+
+
+def test_format_for_kid_uses_its_own_table_only():
+    assert format_for_kid("Light will reflect") == "Light will bounce!"
+    # PT-PT swaps from prompts.SIMPLE_REPLACEMENTS are not applied here
+    assert format_for_kid("você apanha o trem") == "você apanha o trem!"
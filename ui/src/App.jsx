@@ -511,7 +511,12 @@ function App() {
     setAutocomplete(null)
     setSelectedChips(getRandomChips())
     startNewSession()
-    fetch(`${API_URL}/begin-new-topic`, { method: 'POST' }).catch(() => {})
+    // The old session id and history: the server drops its copy of the thread
+    fetch(`${API_URL}/begin-new-topic`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ session_id: sessionId, history: conversationHistory })
+    }).catch(() => {})
     inputRef.current?.focus()
   }
 